@@ -0,0 +1,59 @@
+"""Benchmark RecentIds against the old unbounded set.
+
+Feeds synthetic message IDs through the dedup structure and prints, every
+checkpoint, the time per operation and the process' resident memory. With
+RecentIds both columns stay flat; with ``--baseline`` (plain set) memory
+keeps climbing.
+
+    python bench_dedup.py --count 10000000
+"""
+import argparse
+import time
+
+from chat_dedup import RecentIds, DEFAULT_WINDOW
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        import os
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource  # peak RSS only, but still shows growth
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def run(count: int, window: int, baseline: bool, checkpoints: int):
+    seen = set() if baseline else RecentIds(window)
+    step = max(1, count // checkpoints)
+    name = "set()" if baseline else f"RecentIds(window={window})"
+    print(f"{name}: {count:,} IDs")
+    print(f"{'ids':>12} {'ns/op':>8} {'tracked':>10} {'rss MB':>8}")
+
+    duplicates = 0
+    start = time.perf_counter()
+    for i in range(count):
+        # Every 10th message is a re-delivery of a recent one, like pytchat after a reconnect
+        msg_id = f"ChwKGkNJ{i - 5 if i % 10 == 9 else i:016d}"
+        if msg_id in seen:
+            duplicates += 1
+        else:
+            seen.add(msg_id)
+
+        if (i + 1) % step == 0:
+            elapsed = time.perf_counter() - start
+            print(f"{i + 1:>12,} {elapsed / step * 1e9:>8.0f} {len(seen):>10,} {rss_mb():>8.1f}")
+            start = time.perf_counter()
+
+    print(f"duplicates caught: {duplicates:,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10_000_000)
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW)
+    parser.add_argument("--checkpoints", type=int, default=10)
+    parser.add_argument("--baseline", action="store_true", help="use a plain set instead")
+    args = parser.parse_args()
+    run(args.count, args.window, args.baseline, args.checkpoints)
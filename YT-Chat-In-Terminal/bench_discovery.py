@@ -0,0 +1,104 @@
+"""Benchmark live video ID discovery against a local fixture page.
+
+Serves a fake ``/@handle/live`` page from localhost and compares the old
+full-download scrape with live_discovery's streamed, early-exit scan, plus
+a cached lookup.
+
+    python bench_discovery.py --size 900000 --marker-at 0.3 --runs 50
+"""
+import argparse
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import live_discovery
+from live_discovery import LiveDiscovery
+
+
+def fixture_page(size: int, marker_at: float, live: bool = True) -> bytes:
+    """About ``size`` bytes of filler with the live markers ``marker_at`` of the way in."""
+    filler = b'{"runs":[{"text":"filler"}],"trackingParams":"CAAQhGciEwj"},'
+    markers = b'"videoId":"fakeVideo01","isLiveNow":%s,' % (b"true" if live else b"false")
+    head = int(size * marker_at)
+    body = filler * (head // len(filler)) + markers + filler * ((size - head) // len(filler))
+    return b"<html><script>var ytInitialPlayerResponse = {" + body + b"};</script></html>"
+
+
+def serve(page: bytes):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            try:
+                self.wfile.write(page)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the streamed reader hung up early, which is the point
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def old_get_live_video_id(url: str):
+    """The scrape the scripts used before live_discovery."""
+    resp = requests.get(url)
+    if '"isLiveNow":true' not in resp.text:
+        return None, len(resp.content)
+    match = re.search(r'"videoId":"([a-zA-Z0-9_-]{11})"', resp.text)
+    return (match.group(1) if match else None), len(resp.content)
+
+
+def bench(name: str, runs: int, lookup):
+    read = 0
+    start = time.perf_counter()
+    for _ in range(runs):
+        video_id, n = lookup()
+        read += n
+    ms = (time.perf_counter() - start) / runs * 1000
+    print(f"{name:<28} {ms:>9.2f} ms {read / runs / 1000:>10.1f} KB   -> {video_id}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=900_000, help="fixture page size in bytes")
+    parser.add_argument("--marker-at", type=float, default=0.3, help="where the markers sit, 0..1")
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    page = fixture_page(args.size, args.marker_at)
+    server = serve(page)
+    live_discovery.LIVE_URL = f"http://127.0.0.1:{server.server_port}/{{handle}}/live"
+    url = live_discovery.LIVE_URL.format(handle="@fixture")
+    print(f"fixture page {len(page) / 1000:.0f} KB, markers at {args.marker_at:.0%}, {args.runs} runs\n")
+    print(f"{'approach':<28} {'per lookup':>12} {'bytes read':>13}")
+
+    bench("requests.get + full scan", args.runs, lambda: old_get_live_video_id(url))
+
+    fresh = LiveDiscovery()
+
+    def streamed():
+        before = fresh.bytes_read
+        return fresh.get("@fixture", fresh=True), fresh.bytes_read - before
+
+    bench("session + streamed scan", args.runs, streamed)
+
+    cached = LiveDiscovery()
+    cached.get("@fixture")
+    bench("TTL cache hit", args.runs, lambda: (cached.get("@fixture"), 0))
+    server.shutdown()
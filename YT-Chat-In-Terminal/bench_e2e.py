@@ -0,0 +1,302 @@
+"""End-to-end load test of every chat script against a synthetic chat flood.
+
+Each entry point runs in its own child process with pytchat, pyttsx3, the
+live-page scrape and the Google API client replaced by the fakes in
+fake_chat.py. Every generated message carries a ``#m<n>`` tag so the harness
+can time it from ingest to the terminal, the overlay and the TTS queue.
+
+    python bench_e2e.py --rates 1,100,1000,5000 --duration 10
+    python bench_e2e.py --entry popup-tts.py --rates 500
+"""
+import argparse
+import builtins
+import io
+import json
+import os
+import re
+import runpy
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENTRY_POINTS = [
+    "tts-read-only-yt-chat.py",
+    "tts-read-only-yt-chat-cooler.py",
+    "popup-tts.py",
+    "poptts3.py",
+    "poptts4.py",
+    "ytclichat.py",
+]
+STAGES = ("terminal", "overlay", "tts")
+TAG = re.compile(r"#m(\d+)")
+LIVE_PAGE = '<html>"isLiveNow":true ... "videoId":"fakeVideo01"</html>'
+STARTUP_BACKLOG = 1.0  # seconds of chat said before a startup run joins the stream
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+# ===============================
+# Child: run one script under the fakes
+# ===============================
+class Recorder:
+    """First time each tagged message reaches each stage."""
+
+    def __init__(self):
+        self.ingested = {}
+        self.seen = {stage: {} for stage in STAGES}
+        self.lock = threading.Lock()
+        self.first_shown = None  # wall clock time the first message reached the terminal
+        self.shown = threading.Event()
+
+    def ingest(self, text: str, at: float):
+        for tag in TAG.findall(text):
+            self.ingested.setdefault(int(tag), at)
+
+    def reached(self, stage: str, text: str):
+        now = time.perf_counter()
+        seen = self.seen[stage]
+        with self.lock:
+            for tag in TAG.findall(text):
+                seen.setdefault(int(tag), now)
+                if stage == "terminal" and self.first_shown is None:
+                    self.first_shown = time.time()
+                    self.shown.set()
+
+    def summary(self) -> dict:
+        result = {"ingested": len(self.ingested), "first_shown": self.first_shown}
+        for stage, seen in self.seen.items():
+            latencies = sorted(at - self.ingested[tag] for tag, at in seen.items() if tag in self.ingested)
+            if latencies:
+                result[stage] = {
+                    "count": len(latencies),
+                    "p50": latencies[len(latencies) // 2],
+                    "p95": latencies[int(len(latencies) * 0.95)],
+                    "max": latencies[-1],
+                }
+        return result
+
+
+class TerminalTap(io.TextIOBase):
+    """Stands in for sys.stdout: records tags, then writes to /dev/null for real."""
+
+    def __init__(self, recorder: Recorder):
+        self.recorder = recorder
+        self.sink = open(os.devnull, "w")
+
+    def write(self, text):
+        self.recorder.reached("terminal", text)
+        return self.sink.write(text)
+
+    def flush(self):
+        self.sink.flush()
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.status_code = 200
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        data = self.text.encode()
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+def wrap(owner, name, before):
+    original = getattr(owner, name)
+
+    def wrapper(*args, **kwargs):
+        before(*args, **kwargs)
+        return original(*args, **kwargs)
+
+    setattr(owner, name, wrapper)
+
+
+def install_fakes(args, recorder: Recorder):
+    sys.path.insert(0, HERE)
+    import requests
+    import fake_chat
+
+    # Startup runs join a stream that is already live, so the first fetch gets its recent chat
+    backlog = STARTUP_BACKLOG if args.until_first else 0
+    flood = fake_chat.ChatFlood(rate=args.rate, churn=args.churn, tag=True, seed=1, backlog=backlog)
+    sys.modules["pytchat"] = fake_chat.fake_pytchat(flood, args.fetch_interval)
+    if not args.real_tts:
+        sys.modules["pyttsx3"] = fake_chat.fake_pyttsx3()
+    requests.Session.get = lambda self, *a, **kw: FakeResponse(LIVE_PAGE)
+
+    # Mocked TTS driver: render in-process with the fake engine, "play" for a fixed time
+    import tts_pipeline
+
+    class InProcessWorker:
+        def __init__(self, volume=tts_pipeline.VOLUME):
+            self.engine = fake_chat.FakeEngine()
+            self.proc = self
+
+        def poll(self):
+            return None
+
+        def render(self, voice_id, rate, text, path):
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+
+        def close(self):
+            pass
+
+    tts_pipeline.RenderWorker = InProcessWorker
+    tts_pipeline.play_wav = lambda *paths: time.sleep(args.speech_seconds)
+
+    import chat_core
+    import overlay_events
+    import tts_scheduler
+    import chat_poller
+
+    wrap(chat_core.ChatCore, "publish", lambda self, c: recorder.ingest(c.message, c.ingested))
+    wrap(overlay_events.EventHub, "publish", lambda self, event, data: recorder.reached("overlay", json.dumps(data)))
+    wrap(tts_scheduler.TTSScheduler, "put", lambda self, item, *a, **kw: recorder.reached("tts", str(item)))
+
+    if args.entry == "ytclichat.py":
+        youtube = fake_chat.FakeYouTube(fake_chat.FakeLiveChatMessages(int(args.fetch_interval * 1000)))
+        sys.modules.update(fake_chat.fake_google_modules(youtube))
+        import youtube_client
+        youtube_client.discovery_document = lambda *a, **kw: "{}"
+        # Measure the chat path, not quota pacing (which would poll once a minute)
+        import quota_budget
+        quota_budget.QuotaBudget.poll_interval = lambda self, suggested: suggested
+        original_poll = chat_poller.LiveChatPoller.poll
+
+        def poll(self):
+            items = original_poll(self)
+            now = time.perf_counter()
+            for item in items:
+                recorder.ingest(item["snippet"]["displayMessage"], now)
+            return items
+
+        chat_poller.LiveChatPoller.poll = poll
+
+        def feed():
+            while True:
+                youtube.feed(flood)
+                time.sleep(0.05)
+
+        threading.Thread(target=feed, daemon=True).start()
+
+    # Nobody is typing at the prompt
+    builtins.input = lambda prompt="": threading.Event().wait()
+
+    return flood
+
+
+def child(args):
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_e2e_")
+    os.chdir(workdir)
+    recorder = Recorder()
+    flood = install_fakes(args, recorder)
+    real_stdout = sys.stdout
+    sys.stdout = TerminalTap(recorder)
+
+    def finish():
+        if args.until_first:
+            # Startup runs only wait for the first message to be shown
+            recorder.shown.wait(args.duration)
+            args.warmup = args.duration = 0
+        time.sleep(args.warmup)
+        start_rss, start = rss_mb(), time.perf_counter()
+        time.sleep(args.duration)
+        result = recorder.summary()
+        result.update({
+            "generated": flood.generated,
+            "seconds": time.perf_counter() - start + args.warmup,
+            "rss_start": start_rss,
+            "rss_end": rss_mb(),
+        })
+        real_stdout.write(json.dumps(result) + "\n")
+        real_stdout.flush()
+        os._exit(0)
+
+    threading.Thread(target=finish, daemon=True).start()
+    runpy.run_path(os.path.join(HERE, args.entry), run_name="__main__")
+    threading.Event().wait()  # scripts that return early still get measured
+
+
+# ===============================
+# Parent: run every entry point at every rate
+# ===============================
+def run_one(args, entry: str, rate: float) -> dict:
+    if entry == "poptts4.py" and not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        return {"skipped": "needs a display for Tk"}
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", "--entry", entry, "--rate", str(rate),
+           "--duration", str(args.duration), "--warmup", str(args.warmup),
+           "--fetch-interval", str(args.fetch_interval), "--churn", str(args.churn),
+           "--speech-seconds", str(args.speech_seconds)]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True,
+                              timeout=args.duration + args.warmup + 30)
+    except subprocess.TimeoutExpired:
+        return {"skipped": "timed out"}
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        error = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+        return {"skipped": error[:80]}
+    return json.loads(lines[-1])
+
+
+def fmt(stage: dict) -> str:
+    if not stage:
+        return f"{'-':>22}"
+    return f"{stage['p50'] * 1000:>6.0f}/{stage['p95'] * 1000:>6.0f}/{stage['max'] * 1000:>6.0f}ms"
+
+
+def parent(args):
+    entries = [args.entry] if args.entry else ENTRY_POINTS
+    rates = [float(r) for r in args.rates.split(",")]
+    print(f"ingest -> sink latency as p50/p95/max, {args.duration}s per run\n")
+    print(f"{'entry point':<32} {'msg/s':>6} {'shown/s':>8} {'terminal':>22} {'overlay':>22} "
+          f"{'tts enqueue':>22} {'rss MB':>14}")
+    for entry in entries:
+        for rate in rates:
+            r = run_one(args, entry, rate)
+            if "skipped" in r:
+                print(f"{entry:<32} {rate:>6.0f}  skipped: {r['skipped']}")
+                continue
+            shown = r.get("terminal", {}).get("count", 0) / r["seconds"]
+            print(f"{entry:<32} {rate:>6.0f} {shown:>8.1f} {fmt(r.get('terminal'))} {fmt(r.get('overlay'))} "
+                  f"{fmt(r.get('tts'))} {r['rss_start']:>6.1f}->{r['rss_end']:<6.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entry", choices=ENTRY_POINTS)
+    parser.add_argument("--rates", default="1,100,1000,5000", help="comma separated msg/s")
+    parser.add_argument("--rate", type=float, default=100, help=argparse.SUPPRESS)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--fetch-interval", type=float, default=1.0, help="seconds between fake fetches")
+    parser.add_argument("--churn", type=float, default=0.05, help="share of messages from new authors")
+    parser.add_argument("--speech-seconds", type=float, default=1.0, help="mocked playback time per message")
+    parser.add_argument("--real-tts", action="store_true", help="use the installed pyttsx3 for voice lookup")
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--until-first", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+    else:
+        parent(args)
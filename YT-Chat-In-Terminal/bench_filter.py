@@ -0,0 +1,70 @@
+"""Microbenchmark for the moderation filter: messages per second on one core.
+
+Compiles a blocklist of ``--terms`` random words (plus the built-in link and
+emoji-run rules) and runs chat-like messages through ``ModerationFilter.check``.
+Exits non-zero if it falls below ``--target`` msg/s.
+
+    python bench_filter.py --terms 2000 --messages 200000
+"""
+import argparse
+import random
+import string
+import sys
+import time
+
+from chat_filter import ModerationFilter
+from fake_chat import PHRASES
+
+TARGET = 5000  # msg/s the filter has to sustain
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+
+
+def messages(count: int, blocked: list, rng: random.Random) -> list:
+    extras = ["check https://example.com/x", "🔥" * 8, ":yt::yt::yt::yt::yt::yt::yt:", "go to www.spam.io"]
+    result = []
+    for _ in range(count):
+        words = [rng.choice(PHRASES) for _ in range(rng.randint(1, 4))]
+        roll = rng.random()
+        if roll < 0.05:
+            words.append(rng.choice(blocked))
+        elif roll < 0.08:
+            words.append(rng.choice(extras))
+        result.append(" ".join(words))
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=2000, help="blocked words in the rules")
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--target", type=float, default=TARGET)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    terms = [random_word(rng) for _ in range(args.terms)]
+    third = len(terms) // 3
+    rules = {"drop": terms[:third], "skip_tts": terms[third:2 * third],
+             "mask": terms[2 * third:] + ["frick*"], "allow": ["fricka"]}
+    start = time.perf_counter()
+    moderation = ModerationFilter(rules=rules)
+    compile_ms = (time.perf_counter() - start) * 1000
+    sample = messages(args.messages, terms, rng)
+
+    actions = {}
+    start = time.perf_counter()
+    for text in sample:
+        action, _ = moderation.check(text)
+        actions[action] = actions.get(action, 0) + 1
+    elapsed = time.perf_counter() - start
+
+    rate = len(sample) / elapsed
+    print(f"{args.terms} terms compiled in {compile_ms:.0f} ms")
+    print(f"{len(sample)} messages in {elapsed:.2f}s: {rate:,.0f} msg/s, {elapsed / len(sample) * 1e6:.1f} µs/msg")
+    print("actions: " + ", ".join(f"{k or 'pass'}={v}" for k, v in sorted(actions.items(), key=lambda kv: str(kv[0]))))
+    if rate < args.target:
+        print(f"❌ below the {args.target:,.0f} msg/s target")
+        sys.exit(1)
+    print(f"✅ above the {args.target:,.0f} msg/s target")
@@ -0,0 +1,50 @@
+"""Compare bytes fetched per poll: full backlog vs. pageToken polling.
+
+Runs against the local fake liveChatMessages endpoint, adding a fixed number
+of new messages between polls. The old ``read_chat`` re-downloads the whole
+backlog each time; LiveChatPoller should only pull the new messages.
+
+    python bench_poller.py --polls 20 --new-per-poll 15
+"""
+import argparse
+
+from chat_poller import LiveChatPoller
+from fake_chat import FakeYouTube
+
+
+def fill(youtube, count, start):
+    for i in range(start, start + count):
+        youtube.chat.add_message(f"viewer{i % 300}", f"message number {i}")
+
+
+def run(polls: int, new_per_poll: int, backlog: int):
+    full = FakeYouTube()
+    paged = FakeYouTube()
+    poller = LiveChatPoller(paged, "fake-chat-id")
+    fill(full, backlog, 0)
+    fill(paged, backlog, 0)
+
+    print(f"{'poll':>4} {'new':>4} {'full items':>10} {'full bytes':>11} {'paged items':>11} {'paged bytes':>11}")
+    sent = backlog
+    for n in range(polls):
+        before_full, before_paged = full.chat.bytes_served, paged.chat.bytes_served
+        full_items = full.liveChatMessages().list(liveChatId="fake-chat-id", part="snippet,authorDetails").execute()["items"]
+        paged_items = poller.poll()
+        print(f"{n:>4} {new_per_poll if n else backlog:>4} {len(full_items):>10} "
+              f"{full.chat.bytes_served - before_full:>11,} {len(paged_items):>11} "
+              f"{paged.chat.bytes_served - before_paged:>11,}")
+        fill(full, new_per_poll, sent)
+        fill(paged, new_per_poll, sent)
+        sent += new_per_poll
+
+    print(f"total bytes: full={full.chat.bytes_served:,} paged={paged.chat.bytes_served:,}")
+    print(f"suggested interval: {poller.interval}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=20)
+    parser.add_argument("--new-per-poll", type=int, default=15)
+    parser.add_argument("--backlog", type=int, default=200)
+    args = parser.parse_args()
+    run(args.polls, args.new_per_poll, args.backlog)
@@ -0,0 +1,105 @@
+"""Terminal write syscalls under a chat flood: plain print() vs ChatScreen.
+
+Each mode runs in a child process on its own pseudo-terminal (so stdout is a
+real, line-buffered tty) and prints ``--rate`` colored chat lines a second for
+``--duration`` seconds. The write syscalls and bytes it made come from
+/proc/self/io. Exits non-zero if the screen doesn't cut writes by ``--target``x.
+
+    python bench_screen.py --rate 2000 --duration 5
+"""
+import argparse
+import fcntl
+import json
+import os
+import pty
+import struct
+import sys
+import termios
+import threading
+import time
+
+from chat_screen import ChatScreen
+from fake_chat import PHRASES
+
+TARGET = 10  # times fewer write syscalls the screen has to make
+COLORS = ["\033[31m", "\033[32m", "\033[34m", "\033[36m", "\033[33m", "\033[35m"]
+
+
+def io_counters() -> dict:
+    with open("/proc/self/io") as f:
+        return {key: int(value) for key, value in (line.split(": ") for line in f)}
+
+
+def flood(rate: float, duration: float):
+    end = time.monotonic() + duration
+    n = 0
+    while time.monotonic() < end:
+        n += 1
+        print(f"{COLORS[n % len(COLORS)]}viewer{n % 97}\033[0m: {PHRASES[n % len(PHRASES)]} #{n}")
+        time.sleep(max(0.0, n / rate - (duration - (end - time.monotonic()))))
+    return n
+
+
+def child(mode: str, rate: float, duration: float, report: int):
+    fcntl.ioctl(1, termios.TIOCSWINSZ, struct.pack("HHHH", 40, 120, 0, 0))
+    os.environ["TERM"] = "xterm-256color"
+    before = io_counters()
+    if mode == "print":
+        lines = flood(rate, duration)
+        frames = 0
+    else:
+        screen = ChatScreen()
+        result = {}
+
+        def produce():
+            result["lines"] = flood(rate, duration)
+            screen.stop()
+
+        threading.Thread(target=produce, daemon=True).start()
+        screen.run()
+        lines, frames = result["lines"], screen.frames
+    after = io_counters()
+    os.write(report, json.dumps({
+        "lines": lines,
+        "frames": frames,
+        "writes": after["syscw"] - before["syscw"],
+        "bytes": after["wchar"] - before["wchar"],
+    }).encode())
+    os._exit(0)
+
+
+def run(mode: str, rate: float, duration: float) -> dict:
+    read_end, write_end = os.pipe()
+    pid, master = pty.fork()
+    if pid == 0:
+        os.close(read_end)
+        child(mode, rate, duration, write_end)
+    os.close(write_end)
+    tail = b""
+    while True:  # keep the terminal drained like an emulator would
+        try:
+            tail = (tail + os.read(master, 65536))[-4096:]
+        except OSError:
+            break
+    os.waitpid(pid, 0)
+    with os.fdopen(read_end) as f:
+        report = f.read()
+    if not report:
+        sys.exit(f"{mode} run failed:\n{tail.decode(errors='replace')}")
+    return json.loads(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=2000, help="chat lines per second")
+    parser.add_argument("--duration", type=float, default=5, help="seconds per mode")
+    parser.add_argument("--target", type=float, default=TARGET)
+    args = parser.parse_args()
+
+    results = {mode: run(mode, args.rate, args.duration) for mode in ("print", "screen")}
+    for mode, r in results.items():
+        print(f"{mode:<7} {r['lines']:>7} lines  {r['writes']:>7} writes  "
+              f"{r['bytes'] / 1e6:>6.2f} MB  {r['frames']:>4} frames")
+    ratio = results["print"]["writes"] / max(1, results["screen"]["writes"])
+    print(f"screen makes {ratio:.0f}x fewer write syscalls")
+    sys.exit(0 if ratio >= args.target else 1)
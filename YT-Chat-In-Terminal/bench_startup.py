@@ -0,0 +1,72 @@
+"""Time from launching each chat script to its first chat line on the terminal.
+
+Runs every entry point through bench_e2e's child mode (fake chat, fake live
+page) until the first message is printed. The first run uses an empty
+working directory (cold voice and discovery caches); the following runs
+reuse it (warm caches). Pass ``--real-tts`` to enumerate voices with the
+installed pyttsx3 instead of the fake engine. The fake stream is already
+live with a second of chat in it, which the first fetch or poll returns,
+as YouTube does when a viewer joins.
+
+    python bench_startup.py --runs 5
+    python bench_startup.py --entry popup-tts.py --real-tts
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_e2e import ENTRY_POINTS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TARGET = 1.0  # seconds to first message on a warm cache
+
+
+def first_message(args, entry: str, workdir: str):
+    cmd = [sys.executable, os.path.join(HERE, "bench_e2e.py"), "--child", "--until-first",
+           "--entry", entry, "--workdir", workdir, "--rate", "50", "--duration", str(args.timeout),
+           "--fetch-interval", str(args.fetch_interval)]
+    if args.real_tts:
+        cmd.append("--real-tts")
+    launched = time.time()
+    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=args.timeout + 30)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        return None
+    shown = json.loads(lines[-1]).get("first_shown")
+    return shown - launched if shown else None
+
+
+def fmt(seconds) -> str:
+    return f"{seconds * 1000:>8.0f}ms" if seconds is not None else f"{'-':>10}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entry", choices=ENTRY_POINTS)
+    parser.add_argument("--runs", type=int, default=5, help="warm runs per entry point")
+    parser.add_argument("--fetch-interval", type=float, default=0.05, help="seconds between fake fetches")
+    parser.add_argument("--timeout", type=float, default=20)
+    parser.add_argument("--real-tts", action="store_true")
+    args = parser.parse_args()
+
+    print(f"launch -> first chat line, target {TARGET * 1000:.0f}ms warm\n")
+    print(f"{'entry point':<32} {'cold':>10} {'warm p50':>10} {'warm max':>10}")
+    for entry in [args.entry] if args.entry else ENTRY_POINTS:
+        if entry == "poptts4.py" and not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+            print(f"{entry:<32}  skipped: needs a display for Tk")
+            continue
+        workdir = tempfile.mkdtemp(prefix="bench_startup_")
+        try:
+            cold = first_message(args, entry, workdir)
+            warm = [t for t in (first_message(args, entry, workdir) for _ in range(args.runs)) if t is not None]
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        p50 = statistics.median(warm) if warm else None
+        verdict = "" if p50 is None else ("  ok" if p50 < TARGET else "  over target")
+        print(f"{entry:<32} {fmt(cold)} {fmt(p50)} {fmt(max(warm) if warm else None)}{verdict}")
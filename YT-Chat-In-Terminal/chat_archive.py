@@ -0,0 +1,77 @@
+import gzip
+import json
+import struct
+import sys
+import threading
+
+# ===============================
+# CONFIG
+# ===============================
+FRAME_LINES = 64  # chat lines compressed together into one frame
+HEADER = struct.Struct(">I")  # frame length prefix
+
+
+# ===============================
+# Append-only Chat Archive
+# ===============================
+class ChatArchive:
+    """Chat lines that fell out of the overlay ring, kept on disk.
+
+    Lines are batched into gzip frames, each prefixed with its length, and
+    appended to ``path``. A crash loses at most the unflushed batch, and a
+    torn last frame is skipped when reading back.
+    """
+
+    def __init__(self, path: str, frame_lines: int = FRAME_LINES):
+        self.path = path
+        self.frame_lines = frame_lines
+        self.archived = 0
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def add(self, seq: int, entry: dict):
+        with self._lock:
+            self._pending.append(dict(entry, seq=seq))
+            if len(self._pending) >= self.frame_lines:
+                self._write_frame()
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._write_frame()
+
+    def _write_frame(self):
+        body = "\n".join(json.dumps(entry) for entry in self._pending).encode()
+        frame = gzip.compress(body, compresslevel=6)
+        with open(self.path, "ab") as f:
+            f.write(HEADER.pack(len(frame)) + frame)
+        self.archived += len(self._pending)
+        self._pending = []
+
+    def close(self):
+        self.flush()
+
+
+def read_archive(path: str):
+    """Stream archived lines back, oldest first, one frame in memory at a time."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        while True:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            (length,) = HEADER.unpack(header)
+            frame = f.read(length)
+            if len(frame) < length:
+                return  # torn write at the end
+            for line in gzip.decompress(frame).splitlines():
+                yield json.loads(line)
+
+
+if __name__ == "__main__":
+    # python chat_archive.py chat_archive.bin  ->  dump the archive as JSON lines
+    for entry in read_archive(sys.argv[1] if len(sys.argv) > 1 else "chat_archive.bin"):
+        print(json.dumps(entry, ensure_ascii=False))
@@ -0,0 +1,122 @@
+import copy
+import re
+import time
+from collections import deque
+
+# ===============================
+# CONFIG
+# ===============================
+SPAM_WINDOW = 5.0  # seconds repeats of the same message are folded into one line
+AUTHOR_LIMIT = 5  # messages one author may send per AUTHOR_PERIOD before the rest are dropped
+AUTHOR_PERIOD = 10.0
+
+TOKEN = re.compile(r":[^:\s]+:|\w+")
+REPEATED_CHAR = re.compile(r"(.)\1{2,}")  # 3+ in a row, so "hello" stays put
+
+
+def spam_key(text: str) -> str:
+    """Normalized form that near-identical messages share.
+
+    Case, punctuation and spacing are ignored, runs of three or more of a
+    letter are squeezed ("WWWW", "lollll") and repeated words or emotes
+    count once, so "W", "w w w" and "WWW!!" all map to "w".
+    """
+    words = []
+    for token in TOKEN.findall(text.casefold()):
+        if not token.startswith(":"):
+            token = REPEATED_CHAR.sub(r"\1", token)
+        if not words or words[-1] != token:
+            words.append(token)
+    return " ".join(words) or text.strip()
+
+
+def is_exempt(c) -> bool:
+    """Owner, moderators and paid messages are never folded or limited."""
+    author = c.author
+    if getattr(author, "isChatOwner", False) or getattr(author, "isChatModerator", False):
+        return True
+    return getattr(c, "type", "textMessage") != "textMessage"
+
+
+# ===============================
+# Spam Coalescing Stage
+# ===============================
+class Coalescer:
+    """Folds chat floods into single lines before they reach the sinks.
+
+    The first message with a given ``spam_key`` goes through at once. Repeats
+    within ``window`` seconds are held back and counted, and when the window
+    closes one copy of the first message goes out as "W ×37" (with
+    ``c.repeats`` set). Separately, an author over ``author_limit`` messages
+    per ``author_period`` seconds has the excess dropped.
+    """
+
+    def __init__(self, window: float = SPAM_WINDOW, author_limit: int = AUTHOR_LIMIT,
+                 author_period: float = AUTHOR_PERIOD):
+        self.window = window
+        self.author_limit = author_limit
+        self.author_period = author_period
+        self.folded = 0
+        self.limited = 0
+        self._groups = {}  # spam key -> [first message, repeats, window end]
+        self._authors = {}  # channel ID -> deque of recent send times
+        self._pruned = time.monotonic()
+
+    def _over_limit(self, c, now: float) -> bool:
+        key = getattr(c.author, "channelId", None) or c.author.name
+        sent = self._authors.get(key)
+        if sent is None:
+            sent = self._authors[key] = deque(maxlen=self.author_limit)
+        if len(sent) == self.author_limit and now - sent[0] < self.author_period:
+            return True
+        sent.append(now)
+        return False
+
+    def offer(self, c) -> list:
+        """Messages to hand to the sinks now for incoming message ``c``."""
+        if is_exempt(c):
+            return [c]
+        now = time.monotonic()
+        if self._over_limit(c, now):
+            self.limited += 1
+            return []
+        key = spam_key(c.message)
+        group = self._groups.get(key)
+        if group is not None and now < group[2]:
+            group[1] += 1
+            self.folded += 1
+            return []
+        # A closed window not yet collected by ``expired`` still gets its summary
+        ready = self._close(key) if group is not None else []
+        self._groups[key] = [c, 1, now + self.window]
+        return ready + [c]
+
+    def _close(self, key: str) -> list:
+        first, repeats, _ = self._groups.pop(key)
+        if repeats == 1:
+            return []
+        summary = copy.copy(first)
+        summary.id = f"{first.id}x{repeats}"
+        summary.message = f"{first.message} ×{repeats}"
+        summary.repeats = repeats
+        return [summary]
+
+    def expired(self) -> list:
+        """Summary lines for windows that have closed; call this periodically."""
+        now = time.monotonic()
+        ready = []
+        # Every window is the same length, so insertion order is closing order
+        while self._groups:
+            key = next(iter(self._groups))
+            if now < self._groups[key][2]:
+                break
+            ready += self._close(key)
+        if now - self._pruned >= self.author_period:
+            self._pruned = now
+            for key, sent in list(self._authors.items()):
+                if now - sent[-1] >= self.author_period:
+                    del self._authors[key]
+        return ready
+
+    def summary(self) -> str:
+        return f"🧹 Spam filter: {self.folded} repeats folded, {self.limited} flood messages dropped"
@@ -0,0 +1,328 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import random
+import threading
+import time
+
+import httpx
+import pytchat
+
+from chat_dedup import RecentIds, DEFAULT_WINDOW
+from metrics import REGISTRY
+
+# ===============================
+# CONFIG
+# ===============================
+RECONNECT_DELAY = 5  # seconds before the first reconnect attempt
+MAX_RECONNECT_DELAY = 60  # backoff cap
+SINK_BUFFER = 1000  # messages a slow sink may fall behind before it starts dropping
+MERGE_HOLD = 1.0  # seconds a message may wait for slower channels before it is released
+COALESCE_TICK = 0.5  # how often folded spam ("W ×37") is flushed to the sinks
+DEFAULT_SOURCE = ""
+
+FETCH_TIME = REGISTRY.histogram("chat_fetch_seconds", "Wait for each batch of chat from pytchat")
+
+
+async def live_continuation(video_id: str) -> str:
+    """pytchat's first continuation for a live chat, looked up on a client of its own.
+
+    ``LiveChatAsync`` would look the channel up on the client it then opens
+    with ``async with``, which httpx refuses for a client already used.
+    """
+    async with httpx.AsyncClient(http2=True) as client:
+        channel_id = await pytchat.util.get_channelid_async(client, video_id)
+    return pytchat.paramgen.liveparam.getparam(video_id, channel_id, past_sec=3)
+
+
+# ===============================
+# Multi-channel Merge
+# ===============================
+def source_tag(c) -> str:
+    """``"[@handle] "`` for a message merged from several channels, else ``""``."""
+    return f"[{c.source}] " if getattr(c, "merged", False) else ""
+
+
+class ChatMerger:
+    """k-way merge of chat batches from several channels into timestamp order.
+
+    Each channel delivers its messages in order, one batch per fetch, and
+    they all go into one heap keyed by timestamp. A message is released once
+    every channel being read has delivered something at least as new, or
+    after it has been held ``hold`` seconds, so a quiet channel delays the
+    rest by at most that long. Channels are counted from ``add_source``
+    (before their first batch) until ``remove_source``.
+    """
+
+    def __init__(self, hold: float = MERGE_HOLD):
+        self.hold = hold
+        self._heap = []  # (timestamp, n, arrived, message)
+        self._latest = {}  # source -> newest timestamp delivered
+        self._order = itertools.count()
+
+    def add_source(self, source: str):
+        self._latest[source] = 0  # nothing delivered yet: hold everything for it
+
+    def remove_source(self, source: str):
+        self._latest.pop(source, None)
+
+    def push(self, source: str, batch: list):
+        now = time.monotonic()
+        for c in batch:
+            heapq.heappush(self._heap, (c.timestamp, next(self._order), now, c))
+        if batch:
+            self._latest[source] = max(self._latest.get(source, 0), batch[-1].timestamp)
+
+    def pop_ready(self) -> list:
+        ready = []
+        watermark = min(self._latest.values(), default=0)
+        cutoff = time.monotonic() - self.hold
+        while self._heap and (self._heap[0][0] <= watermark or self._heap[0][2] <= cutoff):
+            ready.append(heapq.heappop(self._heap)[3])
+        return ready
+
+    def next_release(self):
+        """Seconds until the oldest held message is released anyway, or ``None``."""
+        if not self._heap:
+            return None
+        return max(0.0, min(item[2] for item in self._heap) + self.hold - time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class ChatSource:
+    """One channel being read: its current video ID and reconnect state."""
+
+    def __init__(self, name: str, video_id: str):
+        self.name = name
+        self.video_id = video_id
+        self.switched = asyncio.Event()
+        self.delay = RECONNECT_DELAY
+        self.task = None
+
+
+# ===============================
+# Async Chat Ingest Core
+# ===============================
+class ChatCore:
+    """Reads live chats with ``pytchat.LiveChatAsync`` and fans them out to sinks.
+
+    Every sink (terminal printer, TTS, overlay, ...) gets its own asyncio
+    queue and task, so a slow sink never holds up the reader or the others.
+    Messages are deduplicated once here, and each listener reconnects with
+    backoff when pytchat drops. Each message is stamped with ``received``
+    when its batch arrives, and every sink's ingest-to-done time is kept in
+    the ``chat_sink_seconds`` histogram (see metrics.py).
+
+    Sinks are plain functions taking a pytchat message; ``async def`` sinks
+    are awaited, and sinks added with ``blocking=True`` run in a thread.
+
+    ``attach(video_id, source)`` starts reading a channel, or moves it over
+    to a new broadcast. With more than one source the chats are read
+    concurrently and merged into timestamp order by a ``ChatMerger``; every
+    message carries its ``source`` name either way.
+
+    After dedup, an optional ``moderation`` filter (see chat_filter.py) masks
+    or drops messages, and an optional ``coalescer`` (see chat_coalesce.py)
+    folds floods of repeated messages into single lines.
+    """
+
+    def __init__(self, video_id: str = None, dedup_window: int = DEFAULT_WINDOW,
+                 merge_hold: float = MERGE_HOLD, coalescer=None, moderation=None):
+        self.processed = RecentIds(dedup_window)
+        self.moderation = moderation
+        self.coalescer = coalescer
+        self.sources = {}  # name -> ChatSource
+        self.sinks = []  # (handler, blocking, maxsize)
+        self.dropped = 0
+        self._merger = ChatMerger(merge_hold)
+        self._merged = None
+        self._queues = []
+        self._task = None
+        self._loop = None
+        if video_id:
+            self.attach(video_id)
+
+    def add_sink(self, handler, blocking: bool = False, maxsize: int = SINK_BUFFER):
+        self.sinks.append((handler, blocking, maxsize))
+        return handler
+
+    def publish(self, c):
+        """Hand a message to every sink without waiting for any of them."""
+        if c.id in self.processed:
+            return
+        self.processed.add(c.id)
+        if self.moderation is not None and not self.moderation.apply(c):
+            return
+        if self.coalescer is None:
+            self._fan_out(c)
+        else:
+            for out in self.coalescer.offer(c):
+                self._fan_out(out)
+
+    def _fan_out(self, c):
+        for q in self._queues:
+            try:
+                q.put_nowait(c)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    async def _flush_coalesced(self):
+        while True:
+            await asyncio.sleep(COALESCE_TICK)
+            for c in self.coalescer.expired():
+                self._fan_out(c)
+
+    async def _drain(self, q: asyncio.Queue, handler, blocking: bool):
+        is_async = inspect.iscoroutinefunction(handler)
+        latency = REGISTRY.histogram("chat_sink_seconds", "Time from chat ingest until a sink is done with it",
+                                     sink=handler.__name__)
+        while True:
+            c = await q.get()
+            try:
+                if is_async:
+                    await handler(c)
+                elif blocking:
+                    await asyncio.to_thread(handler, c)
+                else:
+                    handler(c)
+            except Exception as e:
+                print(f"⚠️ Chat sink error in {handler.__name__}: {e}")
+            received = getattr(c, "received", None)
+            if received is not None:
+                latency.observe(time.monotonic() - received)
+
+    async def _merge(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._merged.wait(), self._merger.next_release())
+            except asyncio.TimeoutError:
+                pass
+            self._merged.clear()
+            for c in self._merger.pop_ready():
+                self.publish(c)
+
+    async def _read(self, source: ChatSource, video_id: str):
+        """Read one broadcast until it ends or the connection drops."""
+        video_id = pytchat.util.extract_video_id(video_id)
+        continuation = await live_continuation(video_id)
+        # pytchat's default client and processor are shared by every LiveChatAsync and the
+        # client is closed when a chat ends, so each connection needs its own
+        client = httpx.AsyncClient(http2=True)
+        livechat = pytchat.LiveChatAsync(video_id, interruptable=False, client=client,
+                                         processor=pytchat.DefaultProcessor())
+        livechat.continuation = continuation  # before its listener first runs, so it skips its own lookup
+        try:
+            while livechat.is_alive():
+                started = time.monotonic()
+                chatdata = await livechat.get()
+                received = time.monotonic()
+                FETCH_TIME.observe(received - started)
+                if not chatdata:
+                    continue
+                merged = len(self.sources) > 1
+                batch = chatdata.items  # not async_items(), which spreads them over the poll interval
+                for c in batch:
+                    c.source, c.merged, c.received = source.name, merged, received
+                if merged:
+                    self._merger.push(source.name, batch)
+                    self._merged.set()
+                else:
+                    for c in batch:
+                        self.publish(c)
+                source.delay = RECONNECT_DELAY
+            livechat.raise_for_status()
+        finally:
+            livechat.terminate()
+            await client.aclose()
+
+    async def _listen(self, source: ChatSource):
+        label = f" for {source.name}" if source.name else ""
+        while True:
+            source.switched.clear()
+            self._merger.add_source(source.name)
+            reader = asyncio.create_task(self._read(source, source.video_id))
+            switched = asyncio.create_task(source.switched.wait())
+            try:
+                await asyncio.wait({reader, switched}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                reader.cancel()
+                switched.cancel()
+                await asyncio.gather(reader, switched, return_exceptions=True)
+                # Until it reads again, the other channels' messages needn't wait for it
+                self._merger.remove_source(source.name)
+                self._merged.set()
+
+            if not switched.cancelled():
+                print(f"🔀 Switching chat{label} to video {source.video_id}")
+                source.delay = RECONNECT_DELAY
+                continue
+            if reader.cancelled() or reader.exception() is None:
+                print(f"⚠️ Chat{label} ended. Reconnecting...")
+            else:
+                print(f"⚠️ Chat connection error{label}: {reader.exception()}. "
+                      f"Reconnecting in {source.delay}s...")
+            try:
+                # A new video ID cuts the wait short
+                await asyncio.wait_for(source.switched.wait(), source.delay + random.uniform(0, 1))
+                source.delay = RECONNECT_DELAY
+            except asyncio.TimeoutError:
+                source.delay = min(source.delay * 2, MAX_RECONNECT_DELAY)
+
+    def _follow(self, source: ChatSource):
+        if source.task is None:
+            source.task = asyncio.create_task(self._listen(source))
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._merged = asyncio.Event()
+        self._queues = []
+        tasks = []
+        for handler, blocking, maxsize in self.sinks:
+            q = asyncio.Queue(maxsize=maxsize)
+            self._queues.append(q)
+            tasks.append(asyncio.create_task(self._drain(q, handler, blocking)))
+        tasks.append(asyncio.create_task(self._merge()))
+        if self.coalescer is not None:
+            tasks.append(asyncio.create_task(self._flush_coalesced()))
+        for source in list(self.sources.values()):
+            self._follow(source)
+        self._task = self._loop.create_future()
+        try:
+            await self._task
+        finally:
+            tasks += [source.task for source in self.sources.values() if source.task]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def attach(self, video_id: str, source: str = DEFAULT_SOURCE):
+        """Read ``video_id`` as ``source`` from now on; safe to call from any thread."""
+        current = self.sources.get(source)
+        if current is None:
+            current = self.sources[source] = ChatSource(source, video_id)
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._follow, current)
+        elif current.video_id != video_id:
+            current.video_id = video_id
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(current.switched.set)
+
+    def stop(self):
+        """Cancel the listeners; safe to call from any thread."""
+        if self._loop is not None and self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def run_forever(self):
+        try:
+            asyncio.run(self.run())
+        except asyncio.CancelledError:
+            pass
+
+    def start_in_thread(self):
+        """For scripts whose main thread belongs to Tk or Flask."""
+        thread = threading.Thread(target=self.run_forever, daemon=True)
+        thread.start()
+        return thread
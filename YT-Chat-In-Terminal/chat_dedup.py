@@ -0,0 +1,116 @@
+import hashlib
+import math
+import time
+from collections import deque
+
+# ===============================
+# CONFIG
+# ===============================
+DEFAULT_WINDOW = 20000  # recent message IDs kept for exact lookups
+DEFAULT_MAX_AGE = 30 * 60  # seconds before an ID falls out of the window
+DEFAULT_ERROR_RATE = 1e-6  # Bloom false positive rate for older IDs
+
+
+# ===============================
+# Bloom Filter
+# ===============================
+class BloomFilter:
+    """Fixed-size Bloom filter for string keys."""
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key: str) -> list:
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+        h1 = digest & 0xFFFFFFFF
+        h2 = (digest >> 32) | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, key: str, positions: list = None):
+        bits = self.bits
+        for pos in positions or self.positions(key):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def has(self, positions: list) -> bool:
+        bits = self.bits
+        for pos in positions:
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        return self.has(self.positions(key))
+
+    def clear(self):
+        self.bits[:] = bytes(len(self.bits))
+        self.count = 0
+
+
+# ===============================
+# Recent Message IDs
+# ===============================
+class RecentIds:
+    """Memory-constant replacement for the ``processed_messages`` set.
+
+    The newest ``window`` IDs (no older than ``max_age`` seconds) are kept in a
+    ring buffer with an exact set for lookups. Two rotating Bloom filters
+    remember roughly the previous window as well, so IDs that pytchat
+    re-delivers after a reconnect are still caught once they leave the ring.
+    Both add and lookup are O(1) and memory never grows past the window.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, max_age: float = DEFAULT_MAX_AGE,
+                 error_rate: float = DEFAULT_ERROR_RATE):
+        self.window = window
+        self.max_age = max_age
+        self._ring = deque()
+        self._recent = set()
+        self._current = BloomFilter(window, error_rate)
+        self._previous = BloomFilter(window, error_rate)
+        self._generation_start = time.monotonic()
+        self._last_id = None
+        self._last_positions = None
+
+    def _expire(self, now: float):
+        ring = self._ring
+        cutoff = now - self.max_age
+        while ring and (len(ring) > self.window or ring[0][1] < cutoff):
+            old_id, _ = ring.popleft()
+            self._recent.discard(old_id)
+
+        if self._current.count >= self.window or now - self._generation_start > self.max_age:
+            # Reuse the oldest generation's buffer instead of allocating a new one
+            self._previous, self._current = self._current, self._previous
+            self._current.clear()
+            self._generation_start = now
+
+    def _positions(self, msg_id: str) -> list:
+        # Both generations share size and hash count, so hash each ID once.
+        # The reader loops always do a lookup right before add().
+        if self._last_id != msg_id:
+            self._last_id = msg_id
+            self._last_positions = self._current.positions(msg_id)
+        return self._last_positions
+
+    def add(self, msg_id: str):
+        now = time.monotonic()
+        if msg_id not in self._recent:
+            self._recent.add(msg_id)
+            self._ring.append((msg_id, now))
+            self._current.add(msg_id, self._positions(msg_id))
+        self._expire(now)
+
+    def __contains__(self, msg_id: str) -> bool:
+        if msg_id in self._recent:
+            return True
+        positions = self._positions(msg_id)
+        return self._current.has(positions) or self._previous.has(positions)
+
+    def __len__(self) -> int:
+        return len(self._recent)
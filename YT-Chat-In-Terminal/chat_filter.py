@@ -0,0 +1,176 @@
+import json
+import os
+import re
+import time
+
+# ===============================
+# CONFIG
+# ===============================
+RULES_FILE = "moderation.json"
+RELOAD_CHECK = 2.0  # seconds between checks of the rules file for edits
+MASK = "*"
+
+# Actions, mildest first; the strongest one matched in a message wins
+MASK_ACTION = "mask"  # shown and spoken with the term starred out
+SKIP_TTS = "skip_tts"  # shown, never spoken
+DROP = "drop"  # neither shown nor spoken
+ACTIONS = (MASK_ACTION, SKIP_TTS, DROP)
+
+DEFAULT_RULES = {
+    "drop": [],
+    "skip_tts": [],
+    "mask": [],
+    "allow": [],  # words never acted on, even if a blocked term would match them
+    "links": SKIP_TTS,  # action for URLs, or null to let them through
+    "emoji_runs": SKIP_TTS,  # action for long runs of emoji / :emotes:
+    "max_emoji_run": 6,
+}
+
+LINK = r"(?:https?://|www\.)\S+|\b[\w-]+\.(?:com|net|org|io|gg|tv|ly|me|co|xyz)(?:/\S*)?"
+EMOJI = r"(?:[\U0001F000-\U0001FAFF\u2600-\u27BF]\uFE0F?|:[^:\s]+:)\s*"
+RULE_KEYS = {"link": "links", "emoji": "emoji_runs"}  # built-in patterns -> their action setting
+
+
+def trie_pattern(words) -> str:
+    """One regex alternation for many literals, shared prefixes factored out.
+
+    ``["cat", "car", "dog"]`` becomes ``(?:ca(?:t|r)|dog)``, so the regex
+    engine walks a trie instead of retrying every word at every position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end of a word
+
+    def emit(node) -> str:
+        ends = "" in node
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if ends else body
+
+    return emit(trie) if trie else ""
+
+
+def speakable(c) -> bool:
+    return not getattr(c, "skip_tts", False)
+
+
+# ===============================
+# Moderation Filter
+# ===============================
+class ModerationFilter:
+    """Blocklist/allowlist rules compiled into one regex, applied in one pass.
+
+    Rules live in ``RULES_FILE`` (see ``DEFAULT_RULES``) and are reloaded
+    when the file changes. Terms match whole words, case-insensitively; a
+    trailing ``*`` makes a term match as a prefix ("spam*" also catches
+    "spammer"). Allowed words are tried first at each position, so
+    "assassin" can be allowed while "ass*" is masked.
+    """
+
+    def __init__(self, path: str = RULES_FILE, rules: dict = None):
+        self.path = path
+        self.dropped = 0
+        self.masked = 0
+        self.silenced = 0
+        self._mtime = None
+        self._checked = 0.0
+        if rules is not None:
+            self.compile(rules)
+        else:
+            self.compile(DEFAULT_RULES)
+            self.reload()
+
+    def compile(self, rules: dict):
+        rules = {**DEFAULT_RULES, **rules}
+        groups = [f"(?P<allow>(?<!\\w){trie_pattern(w.lower() for w in rules['allow'])}(?!\\w))"
+                  if rules["allow"] else None]
+        for action in (DROP, SKIP_TTS, MASK_ACTION):
+            terms = [t.lower() for t in rules.get(action, []) if t.strip()]
+            whole = [t for t in terms if not t.endswith("*")]
+            prefix = [t[:-1] for t in terms if t.endswith("*")]
+            parts = []
+            if whole:
+                parts.append(f"{trie_pattern(whole)}(?!\\w)")
+            if prefix:
+                parts.append(f"{trie_pattern(prefix)}\\w*")
+            if parts:
+                groups.append(f"(?P<{action}>(?<!\\w)(?:{'|'.join(parts)}))")
+        if rules["links"] in ACTIONS:
+            groups.append(f"(?P<link>{LINK})")
+        if rules["emoji_runs"] in ACTIONS:
+            groups.append(f"(?P<emoji>(?:{EMOJI}){{{max(2, int(rules['max_emoji_run']))},}})")
+        groups = [g for g in groups if g]
+        self.rules = rules
+        self.pattern = re.compile("|".join(groups), re.IGNORECASE) if groups else None
+
+    def reload(self):
+        """Recompile if the rules file changed; a broken file keeps the old rules."""
+        self._checked = time.monotonic()
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.compile(json.load(f))
+            print(f"🛡️ Moderation rules loaded from {self.path}.")
+        except (OSError, ValueError, re.error) as e:
+            print(f"⚠️ Moderation rules not loaded: {e}")
+
+    def check(self, text: str):
+        """Return ``(action, text)``: the strongest action matched (``None`` if
+        nothing matched) and the text with masked terms starred out."""
+        if time.monotonic() - self._checked >= RELOAD_CHECK:
+            self.reload()
+        if self.pattern is None:
+            return None, text
+        severity = -1
+        pieces = []
+        last = 0
+        for match in self.pattern.finditer(text):
+            kind = match.lastgroup
+            if kind == "allow":
+                continue
+            action = self.rules[RULE_KEYS[kind]] if kind in RULE_KEYS else kind
+            level = ACTIONS.index(action)
+            if level == ACTIONS.index(DROP):
+                return DROP, text
+            severity = max(severity, level)
+            if action == MASK_ACTION:
+                pieces.append(text[last:match.start()])
+                pieces.append(MASK * len(match.group()))
+                last = match.end()
+        if severity < 0:
+            return None, text
+        if pieces:
+            pieces.append(text[last:])
+            text = "".join(pieces)
+        return ACTIONS[severity], text
+
+    def apply(self, c) -> bool:
+        """Moderate a pytchat message in place; ``False`` means drop it."""
+        action, text = self.check(c.message)
+        if action is None:
+            return True
+        if action == DROP:
+            self.dropped += 1
+            return False
+        if text != c.message:
+            self.masked += 1
+            c.message = text
+        if action == SKIP_TTS:
+            self.silenced += 1
+            c.skip_tts = True
+        return True
+
+    def summary(self) -> str:
+        return (f"🛡️ Moderation: {self.dropped} dropped, {self.masked} masked, "
+                f"{self.silenced} kept out of TTS")
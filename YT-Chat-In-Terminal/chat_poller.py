@@ -0,0 +1,60 @@
+import time
+
+# ===============================
+# CONFIG
+# ===============================
+DEFAULT_INTERVAL = 5  # seconds, used until the API suggests one
+MIN_INTERVAL = 1  # never poll faster than this, whatever the API says
+
+
+# ===============================
+# Incremental liveChatMessages Poller
+# ===============================
+class LiveChatPoller:
+    """Polls liveChatMessages().list, only fetching messages not seen yet.
+
+    Keeps the ``nextPageToken`` of every response and passes it back as
+    ``pageToken`` so each call returns new messages only, and follows the
+    ``pollingIntervalMillis`` the API asks for instead of a fixed sleep.
+    With a ``budget`` (see quota_budget.py) every call is charged and the
+    interval is stretched to make the daily quota last.
+    """
+
+    def __init__(self, youtube, live_chat_id: str, part: str = "snippet,authorDetails",
+                 budget=None, max_results: int = None):
+        self.youtube = youtube
+        self.live_chat_id = live_chat_id
+        self.part = part
+        self.budget = budget
+        self.max_results = max_results
+        self.next_page_token = None
+        self.interval = DEFAULT_INTERVAL
+        self.last_poll = 0.0
+
+    def poll(self) -> list:
+        kwargs = {"liveChatId": self.live_chat_id, "part": self.part}
+        if self.next_page_token:
+            kwargs["pageToken"] = self.next_page_token
+        if self.max_results:
+            kwargs["maxResults"] = self.max_results
+
+        try:
+            response = self.youtube.liveChatMessages().list(**kwargs).execute()
+        finally:
+            self.last_poll = time.monotonic()
+            if self.budget is not None:
+                self.budget.charge("liveChatMessages.list")  # failed calls cost quota too
+        self.next_page_token = response.get("nextPageToken", self.next_page_token)
+        millis = response.get("pollingIntervalMillis")
+        if millis is not None:
+            self.interval = max(MIN_INTERVAL, millis / 1000)
+        if self.budget is not None:
+            self.interval = self.budget.poll_interval(self.interval)
+        return response.get("items", [])
+
+    def time_until_next_poll(self) -> float:
+        return max(0.0, self.last_poll + self.interval - time.monotonic())
+
+    def wait(self):
+        """Sleep for whatever is left of the server-suggested interval."""
+        time.sleep(self.time_until_next_poll())
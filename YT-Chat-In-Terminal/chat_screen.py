@@ -0,0 +1,275 @@
+import codecs
+import io
+import os
+import re
+import select
+import sys
+import threading
+import time
+import unicodedata
+from collections import deque
+
+# ===============================
+# CONFIG
+# ===============================
+FRAME_RATE = 20  # screen redraws per second, however fast chat arrives
+SCROLLBACK = 5000  # lines kept for PageUp
+STATUS_EVERY = 1.0  # seconds between refreshes of the status line text
+PROMPT = "> "
+QUIT = "q"
+
+ANSI = re.compile(r"\x1b\[[\d;]*m")
+KEYS = {  # escape sequences from the keyboard -> key names
+    "\x1b[5~": "page_up",
+    "\x1b[6~": "page_down",
+    "\x1b[4~": "end",
+    "\x1b[F": "end",
+    "\x1bOF": "end",
+}
+
+# Terminal control
+ALT_SCREEN, MAIN_SCREEN = "\x1b[?1049h", "\x1b[?1049l"
+CLEAR, CLEAR_LINE, RESET = "\x1b[2J", "\x1b[K", "\x1b[0m"
+REVERSE = "\x1b[7m"
+
+
+def _cells(ch: str) -> int:
+    """Terminal columns a character takes: emoji and CJK two, joiners and accents none."""
+    if unicodedata.combining(ch) or unicodedata.category(ch) == "Cf":
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in "WF" else 1
+
+
+def wrap_ansi(line: str, width: int) -> list:
+    """Split an ANSI-colored line into rows of at most ``width`` cells.
+
+    Every row starts with the colors still active from the row before, so
+    rows can be redrawn on their own.
+    """
+    rows, row, used = [], [], 0
+    active = ""
+    pos = 0
+    for match in [*ANSI.finditer(line), None]:
+        for ch in line[pos:match.start()] if match else line[pos:]:
+            if unicodedata.category(ch) == "Cc":
+                ch = " "  # tabs and stray control codes would move the cursor
+            cells = _cells(ch)
+            if used + cells > width:
+                rows.append("".join(row))
+                row, used = [active], 0
+            row.append(ch)
+            used += cells
+        if match is None:
+            break
+        code = match.group()
+        active = "" if code in (RESET, "\x1b[m") else active + code
+        row.append(code)
+        pos = match.end()
+    rows.append("".join(row))
+    return rows
+
+
+# ===============================
+# Full-screen Chat View
+# ===============================
+class ChatScreen(io.TextIOBase):
+    """Full-screen terminal chat: a scrollback ring above one input line.
+
+    While ``run()`` is active the screen stands in for ``sys.stdout``, so the
+    scripts' ``print()`` calls (from any thread) only append to the ring.
+    The terminal is redrawn at most ``fps`` times a second: only rows that
+    changed are rewritten, lines that merely moved up are scrolled in place,
+    and each frame goes out in a single write. A chat flood costs a few
+    writes a second instead of one per message. ANSI colors are kept.
+
+    Typed lines go to ``on_command``; ``quit_command`` (``q``) quits. PageUp/PageDown scroll
+    and End jumps back to the newest line. When stdout is not a terminal
+    (or on Windows) ``run()`` falls back to plain prints and ``input()``.
+    """
+
+    def __init__(self, on_command=None, status=None, fps: float = FRAME_RATE,
+                 scrollback: int = SCROLLBACK, quit_command: str = QUIT):
+        self.on_command = on_command
+        self.quit_command = quit_command
+        self.status = status  # optional callable, its text is shown above the input line
+        self.frame = 1 / fps
+        self.lines = deque(maxlen=scrollback)
+        self.frames = 0
+        self._partial = ""
+        self._input = ""
+        self._keys = ""
+        self._scroll = 0  # lines up from the newest
+        self._dirty = True
+        self._shown = []  # rows as last drawn
+        self._size = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # ---- stdout stand-in ----
+    def write(self, text: str) -> int:
+        with self._lock:
+            parts = (self._partial + text).split("\n")
+            self._partial = parts.pop()
+            self.lines.extend(parts)
+            if self._scroll:
+                self._scroll = min(self._scroll + len(parts), len(self.lines) - 1)
+            self._dirty = True
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def writable(self) -> bool:
+        return True
+
+    # ---- control ----
+    def stop(self):
+        """Make ``run()`` return; safe to call from any thread."""
+        self._stop.set()
+
+    def _dispatch(self, text: str):
+        text = text.strip()
+        if text.lower() == self.quit_command:
+            self.stop()
+        elif text and self.on_command:
+            try:
+                self.on_command(text)
+            except Exception as e:
+                print(f"⚠️ Command failed: {e}")
+
+    def run(self):
+        """Show the screen until ``q``, ``stop()`` or Ctrl+C."""
+        try:
+            import termios
+            import tty
+        except ImportError:
+            return self._run_plain()
+        if not (sys.stdout.isatty() and sys.stdin.isatty()):
+            return self._run_plain()
+
+        real_stdout = sys.stdout
+        real_stdout.flush()
+        fd_in, fd_out = sys.stdin.fileno(), real_stdout.fileno()
+        saved = termios.tcgetattr(fd_in)
+        tty.setcbreak(fd_in)  # keys arrive one at a time, Ctrl+C still interrupts
+        sys.stdout = self
+        try:
+            self._write(fd_out, ALT_SCREEN)
+            self._loop(fd_in, fd_out)
+        finally:
+            sys.stdout = real_stdout
+            self._write(fd_out, "\x1b[r" + RESET + MAIN_SCREEN)
+            termios.tcsetattr(fd_in, termios.TCSADRAIN, saved)
+            if self._partial:
+                print(self._partial)
+
+    def _run_plain(self):
+        def read():
+            while True:
+                try:
+                    line = input()
+                except EOFError:
+                    return  # no keyboard, keep the chat running
+                self._dispatch(line)
+
+        threading.Thread(target=read, daemon=True).start()  # so stop() works while input() waits
+        self._stop.wait()
+
+    # ---- keyboard ----
+    def _loop(self, fd_in: int, fd_out: int):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        status, status_at = "", 0.0
+        deadline = 0.0
+        while not self._stop.is_set():
+            ready, _, _ = select.select([fd_in], [], [], max(0.0, deadline - time.monotonic()))
+            if ready:
+                self._feed(decoder.decode(os.read(fd_in, 1024)))
+                continue  # take all pending keys before drawing
+            now = time.monotonic()
+            deadline = now + self.frame
+            if self.status and now - status_at >= STATUS_EVERY:
+                status, status_at, self._dirty = self.status(), now, True
+            if self._dirty:
+                self._draw(fd_out, status)
+
+    def _feed(self, data: str):
+        self._keys += data
+        while self._keys:
+            keys = self._keys
+            if keys[0] == "\x1b":
+                sequence = next((k for k in KEYS if keys.startswith(k)), None)
+                if sequence is None and any(k.startswith(keys) for k in KEYS):
+                    return  # rest of the sequence is still on its way
+                self._keys = keys[len(sequence):] if sequence else keys[1:]
+                if sequence:
+                    self._key(KEYS[sequence])
+                continue
+            self._keys = keys[1:]
+            self._key(keys[0])
+
+    def _key(self, key: str):
+        with self._lock:
+            self._dirty = True
+            page = max(1, len(self._shown) - 3)
+            if key in ("\r", "\n"):
+                text, self._input = self._input, ""
+            else:
+                if key in ("\b", "\x7f"):
+                    self._input = self._input[:-1]
+                elif key == "\x15":  # Ctrl+U
+                    self._input = ""
+                elif key == "page_up":
+                    self._scroll = min(self._scroll + page, max(0, len(self.lines) - 1))
+                elif key == "page_down":
+                    self._scroll = max(0, self._scroll - page)
+                elif key == "end":
+                    self._scroll = 0
+                elif len(key) == 1 and key.isprintable():
+                    self._input += key
+                return
+        self._dispatch(text)
+
+    # ---- drawing ----
+    @staticmethod
+    def _write(fd: int, text: str):
+        data = memoryview(text.encode())
+        while data:
+            data = data[os.write(fd, data):]
+
+    def _draw(self, fd: int, status: str):
+        width, height = os.get_terminal_size(fd)
+        chat_rows = max(0, height - 2)
+        with self._lock:
+            self._dirty = False
+            scroll, typed = self._scroll, self._input
+            rows = []
+            index = len(self.lines) - 1 - scroll
+            while index >= 0 and len(rows) < chat_rows:
+                rows[:0] = wrap_ansi(self.lines[index], width)
+                index -= 1
+        rows = rows[len(rows) - chat_rows:] if chat_rows else []
+        rows[:0] = [""] * (chat_rows - len(rows))
+        bar = f" ↑ {scroll} lines back (End to follow) " if scroll else ""
+        rows.append(REVERSE + (bar + " " + status)[:width - 1].ljust(width - 1))
+        prompt = (PROMPT + typed)[-(width - 1):]
+        rows.append(prompt)
+
+        out = []
+        if (width, height) != self._size:
+            self._size = (width, height)
+            self._shown = [None] * len(rows)
+            out.append(f"{CLEAR}\x1b[1;{max(1, chat_rows)}r")  # scroll region: the chat rows only
+        elif chat_rows > 1:
+            # Rows that only moved up are scrolled by the terminal, not rewritten
+            old = self._shown[:chat_rows]
+            shift = next((k for k in range(1, chat_rows) if rows[:chat_rows - k] == old[k:]), 0)
+            if shift and rows[:chat_rows - shift] != old[:chat_rows - shift]:
+                out.append(f"\x1b[{shift}S")
+                self._shown[:chat_rows] = old[shift:] + [None] * shift
+        for y, row in enumerate(rows):
+            if row != self._shown[y]:
+                out.append(f"\x1b[{y + 1};1H{RESET}{row}{RESET}{CLEAR_LINE}")
+        self._shown = rows
+        out.append(f"\x1b[{height};{sum(map(_cells, prompt)) + 1}H")
+        self._write(fd, "".join(out))
+        self.frames += 1
@@ -0,0 +1,156 @@
+import queue
+import threading
+import time
+
+# ===============================
+# CONFIG
+# ===============================
+SEND_INTERVAL = 1.5  # seconds between messages once the burst is used up
+SEND_BURST = 2  # messages that may go out back to back
+MAX_PENDING = 20  # messages waiting to be sent before new ones are refused
+RETRIES = 3  # attempts for a message that failed with a server or network error
+RETRY_DELAY = 2  # seconds before the first retry, doubled after each one
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+ECHO_WAIT = 120  # seconds a typed message may wait for its echo or confirmation
+
+
+def is_transient(error: Exception) -> bool:
+    """Worth retrying: rate limits, server errors and dropped connections."""
+    resp = getattr(error, "resp", None)
+    if resp is not None:
+        return getattr(resp, "status", None) in RETRY_STATUSES
+    return isinstance(error, (OSError, TimeoutError))
+
+
+# ===============================
+# Rate-limited Send Queue
+# ===============================
+class SendQueue:
+    """Outgoing chat messages, sent one at a time from a background thread.
+
+    ``submit`` returns at once, so typing never waits on the API. Sends are
+    spaced by a token bucket (``burst`` back to back, then one every
+    ``interval`` seconds) and retried on transient errors. Every message
+    ends with ``on_result(text, message_id, error)``: an ID once YouTube
+    has accepted it, or the error that stopped it.
+    """
+
+    def __init__(self, send, on_result=None, interval: float = SEND_INTERVAL,
+                 burst: int = SEND_BURST, max_pending: int = MAX_PENDING):
+        self.send = send  # text -> message ID
+        self.on_result = on_result
+        self.interval = interval
+        self.burst = burst
+        self.sent = 0
+        self.failed = 0
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+
+    def submit(self, text: str) -> bool:
+        """Queue a message; ``False`` if too many are already waiting."""
+        try:
+            self._queue.put_nowait(text)
+            return True
+        except queue.Full:
+            return False
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _take_token(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) / self.interval)
+        self._refilled = now
+        if self._tokens < 1:
+            time.sleep((1 - self._tokens) * self.interval)
+            self._tokens, self._refilled = 1.0, time.monotonic()
+        self._tokens -= 1
+
+    def _deliver(self, text: str):
+        delay = RETRY_DELAY
+        for attempt in range(RETRIES):
+            self._take_token()
+            try:
+                return self.send(text), None
+            except Exception as e:
+                if attempt == RETRIES - 1 or not is_transient(e):
+                    return None, e
+                time.sleep(delay)
+                delay *= 2
+
+    def _run(self):
+        while True:
+            text = self._queue.get()
+            message_id, error = self._deliver(text)
+            if error is None:
+                self.sent += 1
+            else:
+                self.failed += 1
+            if self.on_result:
+                try:
+                    self.on_result(text, message_id, error)
+                except Exception as e:
+                    print(f"⚠️ Send callback error: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+
+# ===============================
+# Own-message Echo Filter
+# ===============================
+class EchoFilter:
+    """Hides the API's echo of messages already shown when they were typed.
+
+    ``typed(text)`` leaves a pending marker before the message is queued.
+    An echo that arrives before YouTube has confirmed the send is matched
+    to a marker by its text (and by our channel once ``channel_id`` is
+    known); after confirmation it is matched by message ID. A marker that
+    has waited ``max_age`` seconds no longer matches. All methods are
+    thread-safe.
+    """
+
+    def __init__(self, max_age: float = ECHO_WAIT):
+        self.max_age = max_age
+        self.channel_id = None  # ours, learned from the first confirmed send
+        self._pending = []  # (text, typed at)
+        self._ids = set()  # our messages already on screen
+        self._lock = threading.Lock()
+
+    def typed(self, text: str):
+        with self._lock:
+            self._pending.append((text, time.monotonic()))
+
+    def _claim(self, text: str) -> bool:
+        cutoff = time.monotonic() - self.max_age
+        self._pending = [p for p in self._pending if p[1] >= cutoff]
+        for i, (pending, _) in enumerate(self._pending):
+            if pending == text:
+                del self._pending[i]
+                return True
+        return False
+
+    def confirmed(self, text: str, message_id: str):
+        with self._lock:
+            if message_id not in self._ids:  # its echo hasn't come back yet
+                self._ids.add(message_id)
+                self._claim(text)
+
+    def failed(self, text: str):
+        with self._lock:
+            self._claim(text)
+
+    def is_echo(self, message_id: str, text: str, channel_id: str = None) -> bool:
+        """``True`` for one of our messages; skip it, it is on screen already."""
+        with self._lock:
+            if message_id in self._ids:
+                return True
+            if self.channel_id not in (None, channel_id) or not self._claim(text):
+                return False
+            self._ids.add(message_id)  # its confirmation may still be on the way
+            return True
@@ -0,0 +1,389 @@
+"""Local stand-ins for the chat sources, for benchmarks and offline runs.
+
+``ChatFlood`` generates (or replays) chat at a configurable rate with
+realistic author churn; ``FakeLiveChat`` / ``FakeLiveChatAsync`` serve it
+through the same interface as ``pytchat.create`` / ``pytchat.LiveChatAsync``
+and ``FakeLiveChatMessages`` through the YouTube Data API's
+``liveChatMessages`` resource.
+"""
+import asyncio
+import itertools
+import json
+import random
+import time
+import types
+
+# ===============================
+# Synthetic Chat
+# ===============================
+PHRASES = [
+    "W", "W", "W", "lol", "LOL", "hi chat", "hello!", "gg", "first time here",
+    "KEKW", "that was clean", "no way", "😂😂😂", "F", "pog", "what game is this?",
+    "can you play the next level", "o7", "good morning from Brazil", "L",
+]
+MESSAGE_TYPES = [("textMessage", 0.97), ("superChat", 0.015), ("newSponsor", 0.01), ("superSticker", 0.005)]
+
+
+class FakeAuthor:
+    def __init__(self, n: int, kind: str = ""):
+        self.name = f"viewer {n}"
+        self.channelId = f"UCfake{n:018d}"
+        self.channelUrl = "http://www.youtube.com/channel/" + self.channelId
+        self.imageUrl = ""
+        self.badgeUrl = ""
+        self.type = kind
+        self.isVerified = kind == "VERIFIED"
+        self.isChatOwner = kind == "OWNER"
+        self.isChatSponsor = kind == "MEMBER"
+        self.isChatModerator = kind == "MODERATOR"
+
+
+class FakeChat:
+    """Same attributes as a pytchat DefaultProcessor chat item."""
+
+    def __init__(self, msg_id: str, author: FakeAuthor, message: str, kind: str, timestamp: int):
+        self.id = msg_id
+        self.author = author
+        self.message = message
+        self.messageEx = [message]
+        self.type = kind
+        self.timestamp = timestamp
+        self.datetime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp / 1000))
+        self.elapsedTime = ""
+        self.amountValue = 5.0 if kind in ("superChat", "superSticker") else 0.0
+        self.amountString = "$5.00" if self.amountValue else ""
+        self.currency = "USD" if self.amountValue else ""
+        self.bgColor = 0
+        self.ingested = None  # set when a fake source hands the item over
+
+    def json(self) -> str:
+        return json.dumps({"id": self.id, "author": self.author.name, "message": self.message,
+                           "type": self.type, "timestamp": self.timestamp})
+
+
+class ChatFlood:
+    """Chat generated at ``rate`` messages/s from a pool of active authors.
+
+    With probability ``churn`` a message comes from a brand-new author who
+    replaces a random member of the pool, so the user settings layer keeps
+    seeing first-time chatters. ``tag=True`` appends ``#m<n>`` to every
+    message so benchmarks can follow it through the sinks. ``backlog`` is
+    how many seconds of chat were said before the first ``take()``, like a
+    stream that was already live.
+    """
+
+    def __init__(self, rate: float = 50, authors: int = 300, churn: float = 0.05,
+                 tag: bool = False, seed: int = None, replay: list = None, backlog: float = 0):
+        self.rate = rate
+        self.backlog = backlog
+        self.churn = churn
+        self.tag = tag
+        self.random = random.Random(seed)
+        self.generated = 0
+        self._next_author = itertools.count()
+        self._pool = [self._new_author() for _ in range(authors)]
+        self._replay = replay
+        self._started = None
+
+    @classmethod
+    def from_file(cls, path: str, rate: float = 50, **kwargs):
+        """Replay ``{"author": ..., "message": ...}`` JSON lines (e.g. from Chat.json())."""
+        with open(path, "r") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return cls(rate=rate, replay=rows, **kwargs)
+
+    def _new_author(self) -> FakeAuthor:
+        n = next(self._next_author)
+        roll = self.random.random()
+        kind = "OWNER" if n == 0 else "MODERATOR" if roll < 0.01 else "MEMBER" if roll < 0.1 else ""
+        return FakeAuthor(n, kind)
+
+    def _author(self) -> FakeAuthor:
+        if self.random.random() < self.churn:
+            author = self._new_author()
+            self._pool[self.random.randrange(len(self._pool))] = author
+            return author
+        return self.random.choice(self._pool)
+
+    def _make(self) -> FakeChat:
+        n = self.generated
+        self.generated += 1
+        if self._replay:
+            row = self._replay[n % len(self._replay)]
+            author = FakeAuthor(abs(hash(row["author"])) % 10**9)
+            author.name = row["author"]
+            text, kind = row["message"], row.get("type", "textMessage")
+        else:
+            author = self._author()
+            text = self.random.choice(PHRASES)
+            roll, kind = self.random.random(), "textMessage"
+            for name, share in MESSAGE_TYPES:
+                if roll < share:
+                    kind = name
+                    break
+                roll -= share
+        if self.tag:
+            text = f"{text} #m{n}"
+        return FakeChat(f"ChwKGkNJfake{n:016d}", author, text, kind, int(time.time() * 1000))
+
+    def take(self) -> list:
+        """Messages due since the previous call."""
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now - self.backlog
+        due = int((now - self._started) * self.rate)
+        return [self._make() for _ in range(max(0, due - self.generated))]
+
+
+# ===============================
+# Fake pytchat
+# ===============================
+class FakeChatdata:
+    def __init__(self, items: list):
+        self.items = items
+        ingested = time.perf_counter()
+        for c in items:
+            c.ingested = ingested
+
+    def sync_items(self):
+        yield from self.items
+
+    async def async_items(self):
+        for c in self.items:
+            yield c
+
+
+class FakeLiveChat:
+    """``pytchat.create`` stand-in: every ``get`` returns what the flood produced."""
+
+    def __init__(self, flood: ChatFlood, fetch_interval: float = 1.0, duration: float = None):
+        self.flood = flood
+        self.fetch_interval = fetch_interval
+        self._ends = time.monotonic() + duration if duration else None
+        self._last = None
+
+    def is_alive(self) -> bool:
+        return self._ends is None or time.monotonic() < self._ends
+
+    def _wait(self) -> float:
+        if self._last is None:
+            self._last = time.monotonic()
+            return 0
+        return max(0, self._last + self.fetch_interval - time.monotonic())
+
+    def get(self) -> FakeChatdata:
+        time.sleep(self._wait())
+        self._last = time.monotonic()
+        return FakeChatdata(self.flood.take())
+
+    def raise_for_status(self):
+        pass
+
+    def terminate(self):
+        self._ends = time.monotonic()
+
+
+class FakeLiveChatAsync(FakeLiveChat):
+    """``pytchat.LiveChatAsync`` stand-in (get() is a coroutine)."""
+
+    async def get(self) -> FakeChatdata:
+        await asyncio.sleep(self._wait())
+        self._last = time.monotonic()
+        return FakeChatdata(self.flood.take())
+
+
+async def _fake_channel_id(client, video_id: str) -> str:
+    return "UC" + video_id.ljust(22, "_")[:22]
+
+
+def fake_pytchat(flood: ChatFlood, fetch_interval: float = 1.0):
+    """A module object that can replace ``pytchat`` in ``sys.modules``."""
+    module = types.ModuleType("pytchat")
+    module.create = lambda video_id, **kwargs: FakeLiveChat(flood, fetch_interval)
+    module.LiveChatAsync = lambda video_id, **kwargs: FakeLiveChatAsync(flood, fetch_interval)
+    module.DefaultProcessor = object
+    module.util = types.SimpleNamespace(extract_video_id=lambda video_id: video_id,
+                                        get_channelid_async=_fake_channel_id)
+    module.paramgen = types.SimpleNamespace(liveparam=types.SimpleNamespace(getparam=lambda *args, **kwargs: ""))
+    module.__fake__ = True
+    return module
+
+
+# ===============================
+# Fake YouTube Data API (liveChatMessages)
+# ===============================
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class FakeLiveChatMessages:
+    """Mimics youtube.liveChatMessages() closely enough for ytclichat.
+
+    Messages added with ``add_message`` are returned by ``list``; page tokens
+    are offsets into the message log. Without a ``pageToken`` the whole log
+    (up to ``maxResults``) comes back, like the real endpoint's backlog.
+    ``bytes_served`` counts the JSON size of every response.
+    """
+
+    def __init__(self, polling_interval_millis: int = 2000, max_results: int = 500):
+        self.messages = []
+        self.polling_interval_millis = polling_interval_millis
+        self.max_results = max_results
+        self.bytes_served = 0
+        self.calls = 0
+        self._ids = itertools.count()
+
+    def add_message(self, author: str, text: str, owner=False, moderator=False, sponsor=False):
+        self.messages.append({
+            "kind": "youtube#liveChatMessage",
+            "id": f"LCC.fake{next(self._ids):012d}",
+            "snippet": {
+                "type": "textMessageEvent",
+                "displayMessage": text,
+                "textMessageDetails": {"messageText": text},
+            },
+            "authorDetails": {
+                "displayName": author,
+                "isChatOwner": owner,
+                "isChatModerator": moderator,
+                "isChatSponsor": sponsor,
+            },
+        })
+
+    def _list(self, liveChatId, part, pageToken=None, maxResults=None):
+        start = int(pageToken) if pageToken else max(0, len(self.messages) - self.max_results)
+        end = min(len(self.messages), start + (maxResults or self.max_results))
+        response = {
+            "kind": "youtube#liveChatMessageListResponse",
+            "pollingIntervalMillis": self.polling_interval_millis,
+            "nextPageToken": str(end),
+            "items": self.messages[start:end],
+        }
+        self.calls += 1
+        self.bytes_served += len(json.dumps(response))
+        return response
+
+    def _insert(self, part, body):
+        snippet = body["snippet"]
+        self.add_message("Me", snippet["textMessageDetails"]["messageText"])
+        return self.messages[-1]
+
+    def list(self, **kwargs):
+        return _Request(lambda: self._list(**kwargs))
+
+    def insert(self, **kwargs):
+        return _Request(lambda: self._insert(**kwargs))
+
+
+class FakeYouTube:
+    """The subset of the googleapiclient ``youtube`` resource ytclichat uses."""
+
+    def __init__(self, chat: FakeLiveChatMessages = None, live_chat_id: str = "fake-live-chat"):
+        self.chat = chat or FakeLiveChatMessages()
+        self.live_chat_id = live_chat_id
+
+    def liveChatMessages(self):
+        return self.chat
+
+    def videos(self):
+        details = {"liveStreamingDetails": {"activeLiveChatId": self.live_chat_id}}
+        return types.SimpleNamespace(list=lambda **kwargs: _Request(lambda: {"items": [details]}))
+
+    def feed(self, flood: ChatFlood):
+        """Copy whatever the flood has produced into the message log."""
+        for c in flood.take():
+            self.chat.add_message(c.author.name, c.message, owner=c.author.isChatOwner,
+                                  moderator=c.author.isChatModerator, sponsor=c.author.isChatSponsor)
+
+
+# ===============================
+# Fake TTS Driver
+# ===============================
+class FakeVoice:
+    def __init__(self, voice_id: str):
+        self.id = voice_id
+        self.name = voice_id
+        self.languages = []
+
+
+class FakeEngine:
+    """pyttsx3 engine that "speaks" by sleeping briefly and records what it said."""
+
+    voices = [FakeVoice(v) for v in ("gmw/en-US", "gmw/en-GB-scotland", "roa/it", "sit/cmn", "gmw/nl")]
+
+    def __init__(self, words_per_second: float = 0.0):
+        self.properties = {"rate": 200, "volume": 1.0, "voice": self.voices[0].id, "voices": self.voices}
+        self.words_per_second = words_per_second
+        self.spoken = []
+        self._pending = []
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def say(self, text):
+        self._pending.append((text, None))
+
+    def save_to_file(self, text, path):
+        self._pending.append((text, path))
+
+    def runAndWait(self):
+        for text, path in self._pending:
+            if path:
+                with open(path, "wb") as f:
+                    f.write(b"RIFF")
+            elif self.words_per_second:
+                time.sleep(len(text.split()) / self.words_per_second)
+            self.spoken.append(text)
+        self._pending = []
+
+    def stop(self):
+        self._pending = []
+
+
+def fake_pyttsx3():
+    module = types.ModuleType("pyttsx3")
+    module.init = lambda *args, **kwargs: FakeEngine()
+    module.__fake__ = True
+    return module
+
+
+# ===============================
+# Fake Google API client (for ytclichat)
+# ===============================
+class FakeCredentials:
+    valid = True
+    expired = False
+    refresh_token = None
+
+    def refresh(self, request):
+        pass
+
+
+class _FakeFlow:
+    @classmethod
+    def from_client_secrets_file(cls, path, scopes):
+        return cls()
+
+    def run_local_server(self, port=0):
+        return FakeCredentials()
+
+
+def fake_google_modules(youtube: FakeYouTube) -> dict:
+    """``sys.modules`` entries that make ytclichat talk to ``youtube`` offline."""
+    modules = {}
+    for name in ("googleapiclient", "googleapiclient.discovery", "google_auth_oauthlib",
+                 "google_auth_oauthlib.flow", "google", "google.auth", "google.auth.transport",
+                 "google.auth.transport.requests"):
+        modules[name] = types.ModuleType(name)
+    modules["googleapiclient.discovery"].build = lambda *args, **kwargs: youtube
+    modules["googleapiclient.discovery"].build_from_document = lambda *args, **kwargs: youtube
+    modules["google_auth_oauthlib.flow"].InstalledAppFlow = _FakeFlow
+    modules["google.auth.transport.requests"].Request = object
+    return modules
@@ -0,0 +1,114 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+
+# ===============================
+# CONFIG
+# ===============================
+POLL_INTERVAL = 0.5  # seconds between stat() checks when inotify isn't available
+SETTLE = 0.02  # seconds to wait for the rest of a burst of events (editors write in steps)
+
+# inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CLOEXEC = 0o2000000
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then len bytes of name
+
+
+def file_signature(path: str):
+    """``(inode, mtime, size)`` of a file, or ``None`` if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _inotify():
+    """libc handle if this system has inotify, else ``None``."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except (OSError, TypeError):
+        return None
+    return libc if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch") else None
+
+
+# ===============================
+# File Watcher
+# ===============================
+class FileWatcher:
+    """Calls ``on_change()`` from a background thread whenever ``path`` changes.
+
+    On Linux the file's directory is watched with inotify, so edits are seen
+    within milliseconds, including editors that save by writing a temp file
+    and renaming it over the original. Elsewhere the file is stat()ed every
+    ``poll_interval`` seconds.
+    """
+
+    def __init__(self, path: str, on_change, poll_interval: float = POLL_INTERVAL):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.mode = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _changed(self):
+        try:
+            self.on_change()
+        except Exception as e:
+            print(f"⚠️ Failed to apply changes from {os.path.basename(self.path)}: {e}")
+
+    def _watch_inotify(self, libc) -> bool:
+        fd = libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            return False
+        try:
+            directory, name = os.path.split(self.path)
+            if libc.inotify_add_watch(fd, directory.encode(), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+                return False
+            self.mode = "inotify"
+            name = name.encode()
+            while not self._stop.is_set():
+                if not select.select([fd], [], [], 1.0)[0]:
+                    continue
+                hit = False
+                while select.select([fd], [], [], SETTLE)[0]:  # take the whole burst
+                    data = os.read(fd, 64 * 1024)
+                    pos = 0
+                    while pos < len(data):
+                        _, _, _, length = EVENT.unpack_from(data, pos)
+                        pos += EVENT.size
+                        hit = hit or data[pos:pos + length].rstrip(b"\0") == name
+                        pos += length
+                if hit:
+                    self._changed()
+            return True
+        finally:
+            os.close(fd)
+
+    def _watch_polling(self):
+        self.mode = "polling"
+        last = file_signature(self.path)
+        while not self._stop.wait(self.poll_interval):
+            current = file_signature(self.path)
+            if current != last:
+                last = current
+                self._changed()
+
+    def _run(self):
+        libc = _inotify()
+        if libc is None or not self._watch_inotify(libc):
+            self._watch_polling()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
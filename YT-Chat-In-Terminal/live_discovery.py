@@ -0,0 +1,182 @@
+import random
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ===============================
+# CONFIG
+# ===============================
+LIVE_URL = "https://www.youtube.com/{handle}/live"
+LIVE_TTL = 60  # seconds a found video ID is reused; also how often a live channel is re-checked
+NOT_LIVE_TTL = 10  # seconds a "not live" answer is reused; the shortest wait for a stream
+CHUNK_SIZE = 16 * 1024  # bytes read from the page at a time
+TIMEOUT = 10
+WATCH_MIN_WAIT = 10  # first re-check after finding the channel offline
+WATCH_MAX_WAIT = 120  # backoff cap while waiting for a stream
+WATCH_JITTER = 0.2  # extra share of each wait, so restarts don't poll in step
+HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Language": "en"}
+
+LIVE_MARKER = b'"isLiveNow":true'
+VIDEO_ID = re.compile(rb'"videoId":"([a-zA-Z0-9_-]{11})"')
+OVERLAP = 32  # bytes carried between chunks so a marker split across them is still found
+
+
+def scan_live_page(chunks):
+    """Return ``(video_id, bytes_read)`` from an iterable of page chunks.
+
+    Stops reading as soon as the live marker and a video ID have both been
+    seen. Like the old full-page check, the video ID is the first one on the
+    page, and ``None`` is returned unless the page says it is live.
+    """
+    live = False
+    video_id = None
+    read = 0
+    tail = b""
+    for chunk in chunks:
+        read += len(chunk)
+        window = tail + chunk
+        if not live:
+            live = LIVE_MARKER in window
+        if video_id is None:
+            match = VIDEO_ID.search(window)
+            if match:
+                video_id = match.group(1).decode()
+        if live and video_id:
+            return video_id, read
+        tail = window[-OVERLAP:]
+    return (video_id if live else None), read
+
+
+# ===============================
+# Live Video ID Discovery
+# ===============================
+class LiveDiscovery:
+    """Finds a channel's current live video ID from its ``/live`` page.
+
+    One pooled ``requests.Session`` is reused for every lookup, the page is
+    streamed and abandoned once the answer is known, and answers are cached
+    per handle (``None`` for a shorter time than a found ID). If the page
+    comes with an ETag or Last-Modified, the next fetch is conditional and
+    a 304 reuses the previous answer.
+    """
+
+    def __init__(self, ttl: float = LIVE_TTL, not_live_ttl: float = NOT_LIVE_TTL, session=None):
+        self.ttl = ttl
+        self.not_live_ttl = not_live_ttl
+        self.session = session or self._new_session()
+        self.bytes_read = 0
+        self.fetches = 0
+        self._cache = {}  # handle -> (expires, video_id)
+        self._validators = {}  # handle -> conditional request headers
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _new_session():
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        return session
+
+    def fetch(self, handle: str):
+        """Always ask YouTube, then cache the answer."""
+        with self._lock:
+            headers = self._validators.get(handle, {})
+            cached = self._cache.get(handle)
+        resp = self.session.get(LIVE_URL.format(handle=handle), headers=headers, stream=True, timeout=TIMEOUT)
+        try:
+            if resp.status_code == 304 and cached:
+                video_id, read = cached[1], 0
+            else:
+                resp.raise_for_status()
+                video_id, read = scan_live_page(resp.iter_content(CHUNK_SIZE))
+                validators = {}
+                if resp.headers.get("ETag"):
+                    validators["If-None-Match"] = resp.headers["ETag"]
+                if resp.headers.get("Last-Modified"):
+                    validators["If-Modified-Since"] = resp.headers["Last-Modified"]
+                with self._lock:
+                    self._validators[handle] = validators
+        finally:
+            resp.close()
+        ttl = self.ttl if video_id else self.not_live_ttl
+        with self._lock:
+            self.fetches += 1
+            self.bytes_read += read
+            self._cache[handle] = (time.monotonic() + ttl, video_id)
+        return video_id
+
+    def get(self, handle: str, fresh: bool = False):
+        if not fresh:
+            with self._lock:
+                cached = self._cache.get(handle)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+        return self.fetch(handle)
+
+
+discovery = LiveDiscovery()
+
+
+# ===============================
+# Wait-for-live Watcher
+# ===============================
+class LiveWatcher:
+    """Keeps checking a channel and reports its live video ID as it changes.
+
+    Checks go through the finder's TTL cache. While the channel is offline
+    they back off from ``WATCH_MIN_WAIT`` to ``WATCH_MAX_WAIT`` (never
+    sooner than the "not live" TTL); once live, the next check comes when
+    the cached ID expires, so a restarted broadcast is picked up within
+    ``LIVE_TTL``. ``on_live(video_id)`` is called from the watcher thread, typically
+    ``ChatCore.attach``.
+    """
+
+    def __init__(self, handle: str, on_live, finder: LiveDiscovery = None):
+        self.handle = handle
+        self.on_live = on_live
+        self.finder = finder or discovery
+        self.video_id = None
+        self._stop = threading.Event()
+
+    def check(self):
+        video_id = self.finder.get(self.handle)
+        if video_id and video_id != self.video_id:
+            print(f"✅ Live video ID for {self.handle}: {video_id}")
+            self.video_id = video_id
+            self.on_live(video_id)
+        elif not video_id and self.video_id is None:
+            print(f"⏳ {self.handle} is not live yet, waiting...")
+        return video_id
+
+    def run(self):
+        wait = WATCH_MIN_WAIT
+        while not self._stop.is_set():
+            try:
+                live = self.check()
+            except Exception as e:
+                print(f"⚠️ Live check for {self.handle} failed: {e}")
+                live = None
+            if live:
+                wait = WATCH_MIN_WAIT
+                delay = self.finder.ttl
+            else:
+                delay = max(wait, self.finder.not_live_ttl)
+                wait = min(wait * 2, WATCH_MAX_WAIT)
+            # Jitter only lengthens the wait, so the cached answer has expired by the next check
+            self._stop.wait(delay * random.uniform(1, 1 + WATCH_JITTER))
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def watch_channels(handles, core) -> list:
+    """One watcher per channel handle, each attaching its chat to ``core`` under that handle."""
+    return [LiveWatcher(handle, on_live=lambda video_id, h=handle: core.attach(video_id, h)).start()
+            for handle in handles]
@@ -0,0 +1,183 @@
+import threading
+import time
+
+# ===============================
+# CONFIG
+# ===============================
+SUB_BITS = 6  # 2**6 sub-buckets per power of two: values kept to about 3% precision
+MAX_BUCKETS = 1024  # enough for microseconds up to about a day
+EXPORT_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+REPORT_INTERVAL = 60  # seconds between terminal summary lines
+
+_HALF = 1 << (SUB_BITS - 1)
+_FULL = 1 << SUB_BITS
+
+
+def _bucket(us: int) -> int:
+    if us < _FULL:
+        return max(us, 0)
+    shift = us.bit_length() - SUB_BITS
+    return _FULL + (shift - 1) * _HALF + ((us >> shift) - _HALF)
+
+
+def _bucket_floor(index: int) -> int:
+    """Smallest microsecond value that lands in bucket ``index``."""
+    if index < _FULL:
+        return index
+    shift, offset = divmod(index - _FULL, _HALF)
+    return (_HALF + offset) << (shift + 1)
+
+
+def _labels(labels: dict) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}" if labels else ""
+
+
+# ===============================
+# Histogram
+# ===============================
+class Histogram:
+    """HDR-style latency histogram: log-linear buckets over microseconds.
+
+    ``observe`` is a shift, a compare and an increment, so it can sit on
+    the per-message path. Quantiles are read back to about 3%.
+    """
+
+    def __init__(self, name: str, help_text: str, labels: dict = None):
+        self.name = name
+        self.help = help_text
+        self.labels = labels or {}
+        self.counts = [0] * MAX_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        index = min(_bucket(int(seconds * 1_000_000)), MAX_BUCKETS - 1)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def time(self):
+        """``with hist.time(): ...`` observes the block's duration."""
+        return _Timer(self)
+
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, n in enumerate(counts):
+            seen += n
+            if n and seen >= rank:
+                return _bucket_floor(index) / 1_000_000
+        return self.max
+
+    def render(self) -> list:
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.total
+        lines = []
+        cumulative = 0
+        index = 0
+        for bound in EXPORT_BOUNDS:
+            limit = int(bound * 1_000_000)
+            while index < MAX_BUCKETS and _bucket_floor(index) < limit:
+                cumulative += counts[index]
+                index += 1
+            lines.append(f"{self.name}_bucket{_labels({**self.labels, 'le': bound})} {cumulative}")
+        lines.append(f"{self.name}_bucket{_labels({**self.labels, 'le': '+Inf'})} {count}")
+        lines.append(f"{self.name}_sum{_labels(self.labels)} {total:.6f}")
+        lines.append(f"{self.name}_count{_labels(self.labels)} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+# ===============================
+# Registry
+# ===============================
+class Registry:
+    """Named histograms and gauges, shown as Prometheus text or one summary line.
+
+    Gauges are callables read at export time (``tts_queue.qsize``,
+    ``len(user_settings)``...), so nothing is updated on the hot path.
+    """
+
+    def __init__(self):
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._gauges = {}  # name -> (help, fn)
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str, **labels) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(name, help_text, labels)
+            return self._histograms[key]
+
+    def gauge(self, name: str, help_text: str, fn):
+        with self._lock:
+            self._gauges[name] = (help_text, fn)
+
+    def _read_gauges(self):
+        for name, (help_text, fn) in list(self._gauges.items()):
+            try:
+                yield name, help_text, float(fn())
+            except Exception:
+                continue  # a gauge whose object is gone or not ready yet
+
+    def render(self) -> str:
+        lines = []
+        described = set()
+        for histogram in list(self._histograms.values()):
+            if histogram.name not in described:
+                described.add(histogram.name)
+                lines.append(f"# HELP {histogram.name} {histogram.help}")
+                lines.append(f"# TYPE {histogram.name} histogram")
+            lines.extend(histogram.render())
+        for name, help_text, value in self._read_gauges():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value:g}"]
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        parts = []
+        for histogram in list(self._histograms.values()):
+            if histogram.count:
+                label = "/".join(str(v) for v in histogram.labels.values())
+                name = histogram.name.replace("_seconds", "") + (f"[{label}]" if label else "")
+                parts.append(f"{name} p50 {histogram.quantile(0.5) * 1000:.0f}ms "
+                             f"p99 {histogram.quantile(0.99) * 1000:.0f}ms")
+        parts += [f"{name} {value:g}" for name, _, value in self._read_gauges()]
+        return " | ".join(parts)
+
+    def report_every(self, interval: float = REPORT_INTERVAL):
+        """Print ``summary()`` to the terminal every ``interval`` seconds."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                print(f"📈 {self.summary()}")
+
+        threading.Thread(target=loop, daemon=True).start()
+
+    def response(self):
+        from flask import Response
+
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+
+REGISTRY = Registry()
@@ -0,0 +1,191 @@
+import gzip
+import hashlib
+import json
+import queue
+import threading
+from collections import deque
+from itertools import islice
+
+# ===============================
+# CONFIG
+# ===============================
+KEEPALIVE = 15  # seconds between SSE comments on an idle connection
+CLIENT_BUFFER = 500  # events buffered per client before it is dropped as too slow
+FEED_CAPACITY = 500  # chat lines kept for /messages?since=<seq>
+MAX_DELTA = 200  # most lines returned by one /messages call
+GZIP_MIN_BYTES = 512  # smaller responses are not worth compressing
+
+
+def sse_message(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# ===============================
+# Server-Sent Events Hub
+# ===============================
+class EventHub:
+    """Pushes overlay events (new chat lines, TTS state) to every open page.
+
+    Each ``/events`` connection gets its own queue. ``publish`` formats an
+    event once and hands it to all of them; nothing is sent while the chat is
+    quiet apart from a keep-alive comment every ``KEEPALIVE`` seconds.
+    """
+
+    def __init__(self):
+        self._clients = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, data):
+        message = sse_message(event, data)
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.put_nowait(message)
+            except queue.Full:
+                # The page stopped reading; it reconnects and gets a fresh snapshot
+                with self._lock:
+                    self._clients.discard(client)
+
+    def stream(self, snapshot=list):
+        """Generator for a Flask ``Response``.
+
+        ``snapshot()`` returns the ``(event, data)`` pairs a new page starts
+        from; it is called after subscribing so no event is missed.
+        """
+        client = queue.Queue(maxsize=CLIENT_BUFFER)
+        with self._lock:
+            self._clients.add(client)
+        try:
+            yield "retry: 1000\n\n"
+            for event, data in snapshot():
+                yield sse_message(event, data)
+            while client in self._clients:
+                try:
+                    yield client.get(timeout=KEEPALIVE)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+        finally:
+            with self._lock:
+                self._clients.discard(client)
+
+    def response(self, snapshot=list):
+        from flask import Response
+
+        return Response(
+            self.stream(snapshot),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+
+# ===============================
+# Sequence-numbered Chat Feed
+# ===============================
+class ChatFeed:
+    """Ring buffer of the latest chat lines, each tagged with a sequence number.
+
+    Clients remember the last ``seq`` they saw and ask only for newer lines,
+    so several overlays or dashboards can poll without re-fetching history.
+    Memory stays fixed: with an ``archive`` (see chat_archive.py) the line
+    pushed out of a full ring is spilled to it instead of being forgotten.
+    """
+
+    def __init__(self, capacity: int = FEED_CAPACITY, archive=None):
+        self._ring = deque(maxlen=capacity)  # (seq, entry), oldest first
+        self._lock = threading.Lock()
+        self.archive = archive
+        self.seq = 0
+
+    def append(self, entry: dict) -> int:
+        with self._lock:
+            evicted = self._ring[0] if len(self._ring) == self._ring.maxlen else None
+            self.seq += 1
+            self._ring.append((self.seq, entry))
+            seq = self.seq
+        if evicted is not None and self.archive is not None:
+            self.archive.add(*evicted)
+        return seq
+
+    def since(self, seq: int, limit: int = MAX_DELTA) -> list:
+        """Entries newer than ``seq`` (the oldest ``limit`` of them)."""
+        with self._lock:
+            if not self._ring or seq >= self.seq:
+                return []
+            first = self._ring[0][0]
+            start = max(0, seq - first + 1)
+            return list(islice(self._ring, start, start + limit))
+
+    def latest(self, count: int) -> list:
+        with self._lock:
+            return list(self._ring)[-count:] if count else []
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+
+def _encoded(request, body: bytes, headers: dict) -> bytes:
+    if len(body) >= GZIP_MIN_BYTES and request.accept_encodings["gzip"]:
+        headers["Content-Encoding"] = "gzip"
+        body = gzip.compress(body, compresslevel=5)
+    headers["Vary"] = "Accept-Encoding"
+    return body
+
+
+def delta_response(feed: ChatFeed, request):
+    """``/messages?since=<seq>``: only lines newer than the cursor, with ETag/304.
+
+    A cursor past the newest line (the overlay restarted and numbering began
+    again) counts as ``since=0``.
+    """
+    from flask import Response
+
+    try:
+        since = max(0, int(request.args.get("since", 0)))
+    except ValueError:
+        since = 0
+    if since > feed.seq:
+        since = 0  # a cursor from before this process started: send the ring from the start
+    entries = feed.since(since)
+    next_seq = entries[-1][0] if entries else max(since, feed.seq)
+    etag = f"{since}-{next_seq}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    body = json.dumps({
+        "next": next_seq,
+        "messages": [dict(entry, seq=seq) for seq, entry in entries],
+    }).encode()
+    headers = {"Cache-Control": "no-cache"}
+    body = _encoded(request, body, headers)
+    response = Response(body, mimetype="application/json", headers=headers)
+    response.set_etag(etag)
+    return response
+
+
+class StaticPage:
+    """An overlay page rendered once, served with ETag/304 and gzip."""
+
+    def __init__(self, html: str, max_age: int = 3600):
+        self.body = html.encode()
+        self.gzipped = gzip.compress(self.body, compresslevel=9)
+        self.etag = hashlib.sha1(self.body).hexdigest()[:16]
+        self.max_age = max_age
+
+    def response(self, request):
+        from flask import Response
+
+        if request.if_none_match.contains(self.etag):
+            response = Response(status=304)
+        else:
+            headers = {"Vary": "Accept-Encoding"}
+            body = self.body
+            if request.accept_encodings["gzip"]:
+                headers["Content-Encoding"] = "gzip"
+                body = self.gzipped
+            response = Response(body, mimetype="text/html", headers=headers)
+        response.set_etag(self.etag)
+        response.cache_control.max_age = self.max_age
+        return response
@@ -1,24 +1,25 @@
-import pytchat
-import threading
-import time
-from flask import Flask, render_template_string
-from collections import deque
-import requests
-import re
-import sys
+from chat_core import ChatCore, source_tag
+from chat_coalesce import Coalescer
+from chat_filter import ModerationFilter
+from live_discovery import watch_channels
+from overlay_events import EventHub, ChatFeed, StaticPage, delta_response
+from metrics import REGISTRY
 
 # ======================================
 # CONFIGURATION
 # ======================================
-CHANNEL_HANDLE = "@TheVtuberCh"  # Your YouTube channel handle
-REFRESH_INTERVAL = 5  # seconds between chat fetches
+CHANNEL_HANDLES = ["@TheVtuberCh"]  # Your YouTube channel handles, merged into one chat
+DEDUP_WINDOW = 20000  # recent message IDs remembered to skip duplicates
+SPAM_WINDOW = 5  # seconds repeated messages are folded into one "W ×37" line
+AUTHOR_LIMIT = 5  # messages per author every 10 s before the extra ones are dropped
+MODERATION_RULES = "moderation.json"  # blocked/allowed words, reloaded on save
 MAX_MESSAGES = 20  # number of messages to show in overlay
 
 # ======================================
 # Flask overlay setup
 # ======================================
-app = Flask(__name__)
-chat_history = deque(maxlen=MAX_MESSAGES)
+chat_history = ChatFeed()  # seq-numbered lines for /messages?since=<seq>
+events = EventHub()
 
 # HTML + CSS overlay (for OBS)
 HTML_PAGE = """
@@ -56,76 +57,91 @@ body {
   to { opacity: 1; transform: translateY(0); }
 }
 </style>
-<meta http-equiv="refresh" content="1">
 </head>
 <body>
-<div class="chat">
-  {% for author, message in messages %}
-    <div class="msg"><span class="author">{{ author }}:</span> {{ message }}</div>
-  {% endfor %}
-</div>
+<div class="chat" id="chat"></div>
+<script>
+// New lines are pushed over /events, the page itself never reloads
+const MAX_MESSAGES = %d;
+const chat = document.getElementById("chat");
+const source = new EventSource("/events");
+source.addEventListener("reset", () => { chat.textContent = ""; });
+source.addEventListener("chat", (e) => {
+  const [author, message] = JSON.parse(e.data);
+  const line = document.createElement("div");
+  line.className = "msg";
+  const name = document.createElement("span");
+  name.className = "author";
+  name.textContent = author + ":";
+  line.append(name, " " + message);
+  chat.append(line);
+  while (chat.children.length > MAX_MESSAGES) chat.firstElementChild.remove();
+});
+</script>
 </body>
 </html>
-"""
+""" % MAX_MESSAGES
+PAGE = StaticPage(HTML_PAGE)
 
 
-@app.route("/")
-def index():
-    return render_template_string(HTML_PAGE, messages=list(chat_history))
+def create_app():
+    """Flask is imported only once the chat reader is already running."""
+    from flask import Flask, request
 
+    app = Flask(__name__)
 
-# ======================================
-# YouTube Live Video Fetcher
-# ======================================
-def get_live_video_id(channel_handle: str) -> str:
-    """Fetch the currently live video ID for the channel."""
-    url = f"https://www.youtube.com/{channel_handle}/live"
-    resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-    if '"isLiveNow":true' not in resp.text:
-        return None
-    match = re.search(r'"videoId":"([a-zA-Z0-9_-]{11})"', resp.text)
-    if match:
-        return match.group(1)
-    return None
+    @app.route("/")
+    def index():
+        return PAGE.response(request)
+
+    @app.route("/events")
+    def chat_events():
+        def snapshot():
+            return [("reset", None)] + [("chat", (m["author"], m["message"]))
+                                        for _, m in chat_history.latest(MAX_MESSAGES)]
+
+        return events.response(snapshot)
+
+    @app.route("/messages")
+    def messages():
+        """JSON lines newer than ``?since=<seq>``, for dashboards that poll."""
+        return delta_response(chat_history, request)
+
+    @app.route("/metrics")
+    def metrics():
+        """Latency histograms and gauges in Prometheus text format."""
+        return REGISTRY.response()
+
+    return app
 
 
 # ======================================
-# YouTube Chat Listener
+# YouTube Chat Sinks
 # ======================================
-def chat_listener(video_id: str):
-    print(f"🎧 Listening to live chat for video: {video_id}")
-    processed = set()
-    while True:
-        try:
-            chat = pytchat.create(video_id=video_id)
-            while chat.is_alive():
-                for c in chat.get().sync_items():
-                    if c.id in processed:
-                        continue
-                    processed.add(c.id)
-                    author, message = c.author.name, c.message
-                    chat_history.append((author, message))
-                    print(f"{author}: {message}")
-                time.sleep(REFRESH_INTERVAL)
-        except Exception as e:
-            print(f"⚠️ Chat connection error: {e}. Retrying in 5s...")
-            time.sleep(5)
+def overlay_message(c):
+    author, message = c.author.name, c.message
+    chat_history.append({"author": author, "message": message, "source": c.source})
+    events.publish("chat", (author, message))
+
+
+def show_message(c):
+    print(f"{source_tag(c)}{c.author.name}: {c.message}")
 
 
 # ======================================
 # Main Runner
 # ======================================
 if __name__ == "__main__":
-    print("🔍 Fetching live video ID...")
-    video_id = get_live_video_id(CHANNEL_HANDLE)
-    if not video_id:
-        print(f"❌ No active live stream for {CHANNEL_HANDLE}")
-        sys.exit(1)
-
-    print(f"✅ Live video ID: {video_id}")
-    thread = threading.Thread(target=chat_listener, args=(video_id,), daemon=True)
-    thread.start()
+    print(f"🔍 Watching {', '.join(CHANNEL_HANDLES)} for a live stream...")
+    core = ChatCore(dedup_window=DEDUP_WINDOW, coalescer=Coalescer(SPAM_WINDOW, AUTHOR_LIMIT),
+                    moderation=ModerationFilter(MODERATION_RULES))
+    core.add_sink(overlay_message)
+    core.add_sink(show_message)
+    REGISTRY.gauge("dedup_ids", "Message IDs remembered for dedup", lambda: len(core.processed))
+    core.start_in_thread()
+    # Attaches each chat once its channel is live, and follows new broadcast IDs
+    watch_channels(CHANNEL_HANDLES, core)
 
     print("🌐 Flask overlay running at: http://127.0.0.1:5050")
     print("🟢 Open this URL in Firefox and capture it via OBS (Window Capture).")
-    app.run(host="0.0.0.0", port=5050)
+    create_app().run(host="0.0.0.0", port=5050)
@@ -1,23 +1,33 @@
 import tkinter as tk
-import threading
 import queue
-import time
-import pyttsx3
-import pytchat
 import random
-import requests
-import re
-import sys
-import json
-import os
+import itertools
+from collections import deque
+from chat_core import ChatCore, source_tag
+from chat_coalesce import Coalescer
+from chat_filter import ModerationFilter, speakable
+from live_discovery import watch_channels
+from tts_scheduler import TTSScheduler, speech_priority, LOW
+from tts_pipeline import TTSPipeline, voice_ids
+from user_registry import UserRegistry
+from metrics import REGISTRY
 
 # ===============================
 # CONFIG
 # ===============================
-CHANNEL_HANDLE = "@TheVtuberCh"
-REFRESH_INTERVAL = 5
+CHANNEL_HANDLES = ["@TheVtuberCh"]  # channel handles, merged into one chat
+DEDUP_WINDOW = 20000  # recent message IDs remembered to skip duplicates
+SPAM_WINDOW = 5  # seconds repeated messages are folded into one "W ×37" line
+AUTHOR_LIMIT = 5  # messages per author every 10 s before the extra ones are dropped
+MODERATION_RULES = "moderation.json"  # blocked/allowed words, reloaded on save
+MAX_TTS_LAG = 20  # seconds TTS may fall behind chat before messages are skipped
+METRICS_INTERVAL = 60  # seconds between latency summary lines in the terminal
+MAX_VISIBLE_LINES = 15  # labels in the overlay, reused for every new line
+FRAME_MS = 50  # how often the overlay applies queued lines
+MAX_UPDATES_PER_FRAME = 500  # queued line changes applied per frame
 YOUR_NAME = "Me"
-SETTINGS_FILE = "user_settings.json"
+SETTINGS_FILE = "user_settings.json"  # old name-keyed settings, imported once
+USERS_DB = "user_settings.db"
 
 # ===============================
 # Terminal Colors
@@ -34,50 +44,32 @@ RESET = "\033[0m"
 USER_COLORS = list(ANSI_COLORS.keys())
 
 # ===============================
-# Load/Save User Settings
+# User Settings (SQLite, keyed by channel ID)
 # ===============================
-def load_user_settings():
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, "r") as f:
-            return json.load(f)
-    return {}
+def new_user_settings():
+    return {
+        "color": random.choice(USER_COLORS),
+        "voice": random.choice(voice_ids() or [None]),
+    }
 
-def save_user_settings():
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(user_settings, f, indent=2)
-
-user_settings = load_user_settings()
+user_settings = UserRegistry(USERS_DB, new_settings=new_user_settings)
+user_settings.migrate_json(SETTINGS_FILE)
 
 # ===============================
 # TTS Setup
 # ===============================
-tts_engine = pyttsx3.init()
-voices = tts_engine.getProperty("voices")
-tts_engine.setProperty("rate", 150)
-tts_engine.setProperty("volume", 0.8)
-tts_queue = queue.Queue()
-
-def tts_worker():
-    while True:
-        text, author, label = tts_queue.get()
-        if text is None:
-            break
-        try:
-            voice_id = user_settings[author]["voice"]
-            tts_engine.setProperty("voice", voice_id)
-            tts_engine.say(f"{author} says {text}")
-            tts_engine.runAndWait()
-            # Remove label from overlay after speaking
-            label.destroy()
-            chat_labels.remove(label)
-        except Exception as e:
-            print(f"TTS error: {e}")
-        tts_queue.task_done()
-
-threading.Thread(target=tts_worker, daemon=True).start()
-
-def speak_async(text, author, label):
-    tts_queue.put((text, author, label))
+tts_queue = TTSScheduler(max_age=MAX_TTS_LAG, on_drop=lambda item: remove_line(item[3]))
+
+def tts_speech(item):
+    text, author, voice_id, line_id = item
+    return (f"{author} says", text), voice_id
+
+# Clips are rendered by worker processes ahead of playback;
+# the line is removed from the overlay once its clip has played
+tts_pipeline = TTSPipeline(tts_queue, speech=tts_speech, on_done=lambda item: remove_line(item[3])).start()
+
+def speak_async(text, author, voice_id, line_id, priority=LOW):
+    tts_queue.put((text, author, voice_id, line_id), priority, author)
 
 # ===============================
 # Tkinter Overlay Setup
@@ -91,101 +83,88 @@ root.geometry("400x600")
 chat_frame = tk.Frame(root, bg="green")
 chat_frame.pack(fill=tk.BOTH, expand=True)
 
-chat_labels = []
-
-def add_chat_line(author, message):
-    """Add chat line to overlay safely from any thread."""
-    def _add():
-        if author not in user_settings:
-            # Assign random color and voice
-            user_settings[author] = {
-                "color": random.choice(USER_COLORS),
-                "voice": random.choice(voices).id if voices else None,
-            }
-            save_user_settings()
-
-        color_name = user_settings[author].get("color", "white")
-        if color_name not in USER_COLORS:
-            color_name = "white"
-
-        label = tk.Label(chat_frame, text=f"{author}: {message}", fg=color_name,
-                        bg="#222222", bd=2, relief=tk.RIDGE, anchor="w", justify="left",
-                        wraplength=380)
-        label.pack(fill=tk.X, pady=2, padx=5)
-        chat_labels.append(label)
-        return label
-
-
-    # Schedule on main thread and return the label object
-    result = queue.Queue()
-    def wrapper():
-        result.put(_add())
-    root.after(0, wrapper)
-    return result.get()
+# Reader threads only ever put into this queue; the Tk main loop drains it
+# once per frame and redraws a fixed pool of labels.
+overlay_updates = queue.Queue()
+visible_lines = deque(maxlen=MAX_VISIBLE_LINES)  # (line_id, text, color)
+line_ids = itertools.count()
+
+chat_labels = [
+    tk.Label(chat_frame, bg="#222222", bd=2, relief=tk.RIDGE, anchor="w", justify="left",
+             wraplength=380)
+    for _ in range(MAX_VISIBLE_LINES)
+]
+
+def remove_line(line_id):
+    overlay_updates.put(("remove", line_id, None, None))
+
+def add_chat_line(author, message, color_name):
+    """Queue a chat line for the overlay from any thread; returns its id."""
+    if color_name not in USER_COLORS:
+        color_name = "white"
+    line_id = next(line_ids)
+    overlay_updates.put(("add", line_id, f"{author}: {message}", color_name))
+    return line_id
+
+def render_overlay():
+    """Apply queued updates in one batch, then reuse the label pool."""
+    changed = False
+    for _ in range(MAX_UPDATES_PER_FRAME):
+        try:
+            action, line_id, text, color_name = overlay_updates.get_nowait()
+        except queue.Empty:
+            break
+        changed = True
+        if action == "add":
+            visible_lines.append((line_id, text, color_name))
+        else:
+            for line in visible_lines:
+                if line[0] == line_id:
+                    visible_lines.remove(line)
+                    break
 
-# ===============================
-# YouTube Live ID Fetcher
-# ===============================
-def get_live_video_id(channel_handle: str) -> str:
-    url = f"https://www.youtube.com/{channel_handle}/live"
-    resp = requests.get(url)
-    if '"isLiveNow":true' not in resp.text:
-        return None
-    match = re.search(r'"videoId":"([a-zA-Z0-9_-]{11})"', resp.text)
-    if match:
-        return match.group(1)
-    return None
-
-VIDEO_ID = get_live_video_id(CHANNEL_HANDLE)
-if not VIDEO_ID:
-    print("❌ No live stream.")
-    sys.exit(1)
-print(f"✅ Listening to video ID: {VIDEO_ID}")
+    if changed:
+        for label, line in itertools.zip_longest(chat_labels, visible_lines):
+            if line is None:
+                label.pack_forget()
+            else:
+                label.configure(text=line[1], fg=line[2])
+                label.pack(fill=tk.X, pady=2, padx=5)
+    root.after(FRAME_MS, render_overlay)
+
+root.after(FRAME_MS, render_overlay)
 
 # ===============================
-# Chat Reader
+# Chat Sinks
 # ===============================
-def read_chat():
-    processed_messages = set()
-    try:
-        chat = pytchat.create(video_id=VIDEO_ID, interruptable=False)
-    except Exception as e:
-        print(f"Failed to start chat: {e}")
-        return
-
-    while True:
-        try:
-            for c in chat.get().sync_items():
-                if c.id in processed_messages:
-                    continue
-                processed_messages.add(c.id)
-
-                # Assign color for terminal from user settings
-                if c.author.name not in user_settings:
-                    user_settings[c.author.name] = {
-                        "color": random.choice(USER_COLORS),
-                        "voice": random.choice(voices).id if voices else None,
-                    }
-                    save_user_settings()
-
-                color_name = user_settings[c.author.name]["color"]
-                ansi_color = ANSI_COLORS.get(color_name, "\033[37m")
-                print(f"{ansi_color}{c.author.name}: {c.message}{RESET}")
-
-                # Add overlay label
-                label = add_chat_line(c.author.name, c.message)
-
-                if c.author.name != YOUR_NAME:
-                    speak_async(c.message, c.author.name, label)
-
-            time.sleep(REFRESH_INTERVAL)
-        except Exception as e:
-            print(f"Chat error: {e}")
-            time.sleep(5)
+def show_message(c):
+    # Assign color for terminal from user settings
+    settings = user_settings.get(c.author.channelId, c.author.name)
+    ansi_color = ANSI_COLORS.get(settings.get("color", "white"), "\033[37m")
+    print(f"{source_tag(c)}{ansi_color}{c.author.name}: {c.message}{RESET}")
+
+def overlay_message(c):
+    settings = user_settings.get(c.author.channelId, c.author.name)
+
+    # Add overlay line; its TTS removes it once spoken
+    line_id = add_chat_line(c.author.name, c.message, settings.get("color", "white"))
+
+    if c.author.name != YOUR_NAME and speakable(c):
+        speak_async(c.message, c.author.name, settings["voice"], line_id, speech_priority(c))
 
 # ===============================
 # Start chat
 # ===============================
-threading.Thread(target=read_chat, daemon=True).start()
+core = ChatCore(dedup_window=DEDUP_WINDOW, coalescer=Coalescer(SPAM_WINDOW, AUTHOR_LIMIT),
+                moderation=ModerationFilter(MODERATION_RULES))
+core.add_sink(show_message)
+core.add_sink(overlay_message)
+REGISTRY.gauge("tts_queue_depth", "Messages waiting to be spoken", tts_queue.qsize)
+REGISTRY.gauge("dedup_ids", "Message IDs remembered for dedup", lambda: len(core.processed))
+REGISTRY.gauge("registered_users", "Chatters in the settings database", lambda: len(user_settings))
+REGISTRY.report_every(METRICS_INTERVAL)
+# Attaches each chat once its channel is live, and follows new broadcast IDs
+watch_channels(CHANNEL_HANDLES, core)
+core.start_in_thread()
 
 root.mainloop()
@@ -1,23 +1,30 @@
-import pyttsx3
-import pytchat
 import threading
-import queue
-import time
-import requests
-import re
-import sys
-import json
-import os
 import random
-from flask import Flask, render_template_string, jsonify
+from chat_core import ChatCore, source_tag
+from chat_coalesce import Coalescer
+from chat_filter import ModerationFilter, speakable
+from live_discovery import watch_channels
+from tts_scheduler import TTSScheduler, speech_priority, LOW
+from tts_pipeline import TTSPipeline, voice_ids
+from overlay_events import EventHub, ChatFeed, StaticPage, delta_response
+from chat_archive import ChatArchive
+from user_registry import UserRegistry
+from metrics import REGISTRY
 
 # ===============================
 # CONFIG
 # ===============================
-CHANNEL_HANDLE = "@TheVtuberCh"
-REFRESH_INTERVAL = 5
+CHANNEL_HANDLES = ["@TheVtuberCh"]  # channel handles, merged into one chat
+DEDUP_WINDOW = 20000  # recent message IDs remembered to skip duplicates
+SPAM_WINDOW = 5  # seconds repeated messages are folded into one "W ×37" line
+AUTHOR_LIMIT = 5  # messages per author every 10 s before the extra ones are dropped
+MODERATION_RULES = "moderation.json"  # blocked/allowed words, reloaded on save
+MAX_TTS_LAG = 20  # seconds TTS may fall behind chat before messages are skipped
 YOUR_NAME = "Me"
-SETTINGS_FILE = "user_settings.json"
+SETTINGS_FILE = "user_settings.json"  # old name-keyed settings, imported once
+USERS_DB = "user_settings.db"
+OVERLAY_HISTORY = 500  # chat lines kept in memory for the overlay
+CHAT_ARCHIVE = "chat_archive.bin"  # older lines, read back with chat_archive.py
 
 # ===============================
 # Terminal Colors
@@ -28,56 +35,105 @@ COLORS = ["\033[31m", "\033[32m", "\033[34m", "\033[36m", "\033[33m", "\033[35m"
 # ===============================
 # Flask Overlay Setup
 # ===============================
-app = Flask(__name__)
-chat_history = []
+chat_archive = ChatArchive(CHAT_ARCHIVE)
+chat_history = ChatFeed(OVERLAY_HISTORY, archive=chat_archive)  # lines for /messages?since=<seq>
 current_tts = {"author": "", "message": ""}
+events = EventHub()
+
+
+OVERLAY_HTML = """
+<html>
+<head>
+<style>
+    body {
+        background: transparent;
+        color: white;
+        font-family: Arial, sans-serif;
+        font-size: 20px;
+        overflow: hidden;
+    }
+    .chatline {
+        margin-bottom: 4px;
+    }
+    .tts {
+        color: yellow;
+        font-weight: bold;
+        text-shadow: 0 0 10px yellow;
+        animation: fade 2s ease-out;
+    }
+    @keyframes fade {
+        0% {opacity: 1;}
+        100% {opacity: 0;}
+    }
+</style>
+</head>
+<body>
+    <div id="chat"></div>
+    <div id="tts"></div>
+    <script>
+    // Chat lines and TTS state are pushed over /events, nothing is polled
+    const chat = document.getElementById("chat");
+    const tts = document.getElementById("tts");
+    const source = new EventSource("/events");
+    source.addEventListener("reset", () => { chat.textContent = ""; tts.textContent = ""; });
+    source.addEventListener("chat", (e) => {
+        const line = document.createElement("div");
+        line.className = "chatline";
+        line.textContent = JSON.parse(e.data);
+        chat.append(line);
+        while (chat.children.length > 10) chat.firstElementChild.remove();
+    });
+    source.addEventListener("tts", (e) => {
+        const state = JSON.parse(e.data);
+        tts.textContent = "";
+        if (state.author) {
+            const line = document.createElement("div");
+            line.className = "tts";
+            line.textContent = state.author + " says " + state.message;
+            tts.append(line);
+        }
+    });
+    </script>
+</body>
+</html>
+"""
+OVERLAY_PAGE = StaticPage(OVERLAY_HTML)
 
 
-@app.route("/")
-def overlay():
-    html = """
-    <html>
-    <head>
-    <meta http-equiv="refresh" content="1">
-    <style>
-        body {
-            background: transparent;
-            color: white;
-            font-family: Arial, sans-serif;
-            font-size: 20px;
-            overflow: hidden;
-        }
-        .chatline {
-            margin-bottom: 4px;
-        }
-        .tts {
-            color: yellow;
-            font-weight: bold;
-            text-shadow: 0 0 10px yellow;
-            animation: fade 2s ease-out;
-        }
-        @keyframes fade {
-            0% {opacity: 1;}
-            100% {opacity: 0;}
-        }
-    </style>
-    </head>
-    <body>
-        {% for line in chat %}
-            <div class="chatline">{{ line }}</div>
-        {% endfor %}
-        {% if tts.author %}
-            <div class="tts">{{ tts.author }} says {{ tts.message }}</div>
-        {% endif %}
-    </body>
-    </html>
-    """
-    return render_template_string(html, chat=chat_history[-10:], tts=current_tts)
+def create_app():
+    """Flask is imported here, on the overlay thread, so the chat starts without waiting for it."""
+    from flask import Flask, request
+
+    app = Flask(__name__)
+
+    @app.route("/")
+    def overlay():
+        return OVERLAY_PAGE.response(request)
+
+    @app.route("/events")
+    def overlay_events():
+        def snapshot():
+            return ([("reset", None)] + [("chat", m["line"]) for _, m in chat_history.latest(10)]
+                    + [("tts", dict(current_tts))])
+
+        return events.response(snapshot)
+
+    @app.route("/messages")
+    def messages():
+        """JSON lines newer than ``?since=<seq>``, for dashboards that poll."""
+        return delta_response(chat_history, request)
+
+    @app.route("/metrics")
+    def metrics():
+        """Latency histograms and queue gauges in Prometheus text format."""
+        return REGISTRY.response()
+
+    return app
 
 
 # Run Flask server in a thread
 def run_overlay():
-    app.run(host="0.0.0.0", port=5000, debug=False, use_reloader=False)
+    create_app().run(host="0.0.0.0", port=5000, debug=False, use_reloader=False)
 
 
 threading.Thread(target=run_overlay, daemon=True).start()
@@ -85,125 +141,94 @@ threading.Thread(target=run_overlay, daemon=True).start()
 # ===============================
 # TTS Setup
 # ===============================
-tts_engine = pyttsx3.init()
-voices = tts_engine.getProperty("voices")
-tts_engine.setProperty("rate", 150)
-tts_engine.setProperty("volume", 0.8)
-tts_queue = queue.Queue()
+tts_queue = TTSScheduler(max_age=MAX_TTS_LAG)
+
 
+def tts_started(item):
+    text, voice_id, author = item
+    current_tts["author"] = author
+    current_tts["message"] = text
+    events.publish("tts", current_tts)
 
-def tts_worker():
-    while True:
-        text, voice_id, author = tts_queue.get()
-        if text is None:
-            break
-        try:
-            current_tts["author"] = author
-            current_tts["message"] = text
-            tts_engine.setProperty("voice", voice_id)
-            tts_engine.say(text)
-            tts_engine.runAndWait()
-            current_tts["author"] = ""
-            current_tts["message"] = ""
-        except Exception as e:
-            print(f"TTS error: {e}")
-        tts_queue.task_done()
 
+def tts_finished(item):
+    current_tts["author"] = ""
+    current_tts["message"] = ""
+    events.publish("tts", current_tts)
 
-threading.Thread(target=tts_worker, daemon=True).start()
 
+# Clips are rendered by worker processes ahead of playback
+tts_pipeline = TTSPipeline(
+    tts_queue,
+    speech=lambda item: (item[0], item[1]),
+    on_start=tts_started,
+    on_done=tts_finished,
+).start()
 
-def speak_async(text, voice_id, author):
-    tts_queue.put((text, voice_id, author))
+
+def speak_async(text, voice_id, author, priority=LOW):
+    tts_queue.put((text, voice_id, author), priority, author)
 
 
 # ===============================
 # Persistent User Settings
 # ===============================
-def load_user_settings():
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, "r") as f:
-            return json.load(f)
-    return {}
+def new_user_settings():
+    return {
+        "color": random.choice(COLORS),
+        "voice": random.choice(voice_ids() or [None]),
+    }
 
 
-def save_user_settings():
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(user_settings, f)
+user_settings = UserRegistry(USERS_DB, new_settings=new_user_settings)
+user_settings.migrate_json(SETTINGS_FILE)
 
 
-user_settings = load_user_settings()
-
-
-def get_user_settings(username):
-    if username not in user_settings:
-        user_settings[username] = {
-            "color": random.choice(COLORS),
-            "voice": random.choice(voices).id if voices else None,
-        }
-        save_user_settings()
-    return user_settings[username]
+def get_user_settings(author):
+    return user_settings.get(author.channelId, author.name)
 
 
 # ===============================
-# YouTube Live ID Fetcher
+# Chat Sinks
 # ===============================
-def get_live_video_id(channel_handle: str) -> str:
-    url = f"https://www.youtube.com/{channel_handle}/live"
-    resp = requests.get(url)
-    if '"isLiveNow":true' not in resp.text:
-        return None
-    match = re.search(r'"videoId":"([a-zA-Z0-9_-]{11})"', resp.text)
-    if match:
-        return match.group(1)
-    return None
+def show_message(c):
+    color = get_user_settings(c.author)["color"]
+    print(f"{source_tag(c)}{color}{c.author.name}: {c.message}{RESET}")
 
 
-video_id = get_live_video_id(CHANNEL_HANDLE)
-if not video_id:
-    print(f"\033[31m❌ No live stream currently for {CHANNEL_HANDLE}.\033[0m")
-    sys.exit(1)
+def overlay_message(c):
+    line = f"{source_tag(c)}{c.author.name}: {c.message}"
+    chat_history.append({"author": c.author.name, "line": line})
+    events.publish("chat", line)
 
-print(f"✅ Live video ID: {video_id}")
+
+def speak_message(c):
+    if c.author.name != YOUR_NAME and speakable(c):
+        voice_id = get_user_settings(c.author)["voice"]
+        speak_async(c.message, voice_id, c.author.name, speech_priority(c))
 
 
 # ===============================
 # Chat Reader
 # ===============================
-def run_chat(video_id):
-    processed_messages = set()
-    print(f"🎧 Listening to live chat for {CHANNEL_HANDLE}...\n")
-
-    while True:
-        try:
-            chat = pytchat.create(video_id=video_id)
-            while chat.is_alive():
-                for c in chat.get().sync_items():
-                    msg_id = c.id
-                    if msg_id in processed_messages:
-                        continue
-                    processed_messages.add(msg_id)
-
-                    author = c.author.name
-                    message = c.message
-                    settings = get_user_settings(author)
-                    color = settings["color"]
-                    voice_id = settings["voice"]
-
-                    line = f"{author}: {message}"
-                    print(f"{color}{line}{RESET}")
-                    chat_history.append(line)
-
-                    if author != YOUR_NAME:
-                        speak_async(message, voice_id, author)
-                time.sleep(REFRESH_INTERVAL)
-        except Exception as e:
-            print(f"⚠️ Chat connection error: {e}. Reconnecting in 5s...")
-            time.sleep(5)
-
+core = ChatCore(dedup_window=DEDUP_WINDOW, coalescer=Coalescer(SPAM_WINDOW, AUTHOR_LIMIT),
+                moderation=ModerationFilter(MODERATION_RULES))
+core.add_sink(show_message)
+core.add_sink(overlay_message)
+core.add_sink(speak_message)
+REGISTRY.gauge("tts_queue_depth", "Messages waiting to be spoken", tts_queue.qsize)
+REGISTRY.gauge("dedup_ids", "Message IDs remembered for dedup", lambda: len(core.processed))
+REGISTRY.gauge("registered_users", "Chatters in the settings database", lambda: len(user_settings))
+# Attaches each chat once its channel is live, and follows new broadcast IDs
+watch_channels(CHANNEL_HANDLES, core)
+print(f"🎧 Listening to live chat for {', '.join(CHANNEL_HANDLES)}...\n")
 
 try:
-    run_chat(video_id)
+    core.run_forever()
 except KeyboardInterrupt:
     print("\n🛑 Stopping chat listener...")
-    save_user_settings()
+    print(tts_queue.summary())
+    print(core.coalescer.summary())
+    print(core.moderation.summary())
+    user_settings.close()
+    chat_archive.close()
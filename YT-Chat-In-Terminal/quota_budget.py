@@ -0,0 +1,232 @@
+"""Daily YouTube Data API quota budget for ytclichat.
+
+Every API call is charged its documented unit cost. Polling runs at the
+pace the API suggests and is only slowed down when that pace would use up
+the quota before the end of the stream (``STREAM_HOURS`` after the first
+poll) or before the quota resets (midnight Pacific time), whichever comes
+first. Usage is kept in a small JSON file so restarts don't forget it. Run
+this file to simulate how long the quota lasts at different chat rates:
+
+    python quota_budget.py --rates 1,10,100,1000 --sends-per-hour 30 --stream-hours 4
+"""
+import argparse
+import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+
+# ===============================
+# CONFIG
+# ===============================
+DAILY_QUOTA = 10000  # default project quota, units per day
+SEND_ALLOWANCE = 20  # messages a day; their quota is kept back from polling
+STREAM_HOURS = 4  # expected stream length; polling is paced to last this long, not the whole day
+USAGE_FILE = "quota_usage.json"
+MAX_RESULTS = 2000  # liveChatMessages.list page size; big pages make slow polls lose nothing
+QUOTA_TIMEZONE = "America/Los_Angeles"  # the quota day resets at midnight Pacific time
+COSTS = {  # units per call
+    "videos.list": 1,
+    "liveChatMessages.list": 5,
+    "liveChatMessages.insert": 50,
+}
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _TZ = ZoneInfo(QUOTA_TIMEZONE)
+except Exception:  # no tz database (e.g. Windows without tzdata): use standard time
+    _TZ = datetime.timezone(datetime.timedelta(hours=-8))
+
+
+def quota_day(now: float):
+    """``(day, seconds until it resets)`` for a Unix time."""
+    local = datetime.datetime.fromtimestamp(now, _TZ)
+    midnight = datetime.datetime.combine(local.date() + datetime.timedelta(days=1),
+                                         datetime.time(), _TZ)
+    return local.date().isoformat(), midnight.timestamp() - now
+
+
+# ===============================
+# Quota Budget
+# ===============================
+class QuotaBudget:
+    """Tracks the units spent today and paces polling to fit the daily quota.
+
+    ``charge(method)`` records a call. ``poll_interval(suggested)`` returns
+    the server's suggested interval, stretched when polling at that pace
+    would use up the quota before the session ends (``session_hours`` after
+    the first poll) or the day resets. Past the session length, or with
+    ``session_hours=None``, it paces to the reset. Sending gets its own
+    allowance of ``sends`` messages a day that polling never touches;
+    ``can_afford`` tells whether a call still fits.
+    """
+
+    def __init__(self, daily: int = DAILY_QUOTA, path: str = USAGE_FILE,
+                 sends: int = SEND_ALLOWANCE, session_hours: float = STREAM_HOURS, clock=time.time):
+        self.daily = daily
+        self.path = path
+        self.reserve = sends * COSTS["liveChatMessages.insert"]
+        self.session_hours = session_hours
+        self.session_end = None  # set by the first poll
+        self.clock = clock
+        self.day = None
+        self.used = 0
+        self.calls = {}
+        self._warned = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.day, self.used, self.calls = data["day"], int(data["used"]), dict(data.get("calls", {}))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Quota usage not loaded: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".quota_usage.", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"day": self.day, "used": self.used, "calls": self.calls}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            os.unlink(tmp_path)
+            print(f"⚠️ Quota usage not saved: {e}")
+
+    def _roll(self, now: float) -> float:
+        """Start a fresh day if the quota has reset; returns seconds until the next reset."""
+        day, left = quota_day(now)
+        if day != self.day:
+            self.day, self.used, self.calls, self._warned = day, 0, {}, False
+        return left
+
+    def charge(self, method: str, calls: int = 1):
+        with self._lock:
+            self._roll(self.clock())
+            self.used += COSTS[method] * calls
+            self.calls[method] = self.calls.get(method, 0) + calls
+            self._save()
+
+    def remaining(self) -> int:
+        with self._lock:
+            self._roll(self.clock())
+            return self.daily - self.used
+
+    def _held_back(self) -> int:
+        """Units of today's send allowance not spent yet."""
+        sent = self.calls.get("liveChatMessages.insert", 0) * COSTS["liveChatMessages.insert"]
+        return max(0, self.reserve - sent)
+
+    def can_afford(self, method: str) -> bool:
+        with self._lock:
+            self._roll(self.clock())
+            left = self.daily - self.used
+            if method == "liveChatMessages.insert":
+                return min(left, self._held_back()) >= COSTS[method]
+            return left - self._held_back() >= COSTS[method]
+
+    def poll_interval(self, suggested: float) -> float:
+        """Seconds until the next liveChatMessages.list, at least ``suggested``."""
+        with self._lock:
+            now = self.clock()
+            left = self._roll(now)
+            polls = (self.daily - self.used - self._held_back()) / COSTS["liveChatMessages.list"]
+            if self.session_end is None and self.session_hours:
+                self.session_end = now + self.session_hours * 3600
+        if polls < 1:
+            if not self._warned:
+                self._warned = True
+                print(f"⚠️ Daily API quota used up; chat pauses until it resets in {left / 3600:.1f}h.")
+            return max(suggested, left)
+        horizon = left
+        if self.session_end is not None and self.session_end > now:
+            horizon = min(left, self.session_end - now)
+        return max(suggested, horizon / polls)
+
+    def summary(self) -> str:
+        calls = ", ".join(f"{n} {method}" for method, n in self.calls.items())
+        return f"📊 API quota: {self.used}/{self.daily} units used today ({calls or 'no calls'})"
+
+
+# ===============================
+# Simulator
+# ===============================
+def simulate(rate: float, sends_per_hour: float, suggested: float, daily: int = DAILY_QUOTA,
+             budgeted: bool = True, max_results: int = MAX_RESULTS, session_hours: float = None) -> dict:
+    """Run one stream on a simulated clock. ``rate`` is chat messages per second.
+
+    The stream starts when the quota day does and lasts ``session_hours``,
+    or the whole day with ``None``; budgeted polling is paced to its end.
+    Unbudgeted polls every ``suggested`` seconds and sends whenever asked
+    until the quota is gone, like ytclichat did before.
+    """
+    day, _ = quota_day(time.time())
+    start = datetime.datetime.fromisoformat(day).replace(tzinfo=_TZ).timestamp()
+    clock = [start]
+    budget = QuotaBudget(daily, path=None, sends=SEND_ALLOWANCE if budgeted else 0,
+                         session_hours=session_hours, clock=lambda: clock[0])
+    budget._warned = True  # no pause warnings from the simulation
+    end = start + (session_hours or 24) * 3600
+    next_send = start
+    intervals = []
+    sent = refused = lost = 0
+    while clock[0] < end and budget.can_afford("liveChatMessages.list"):
+        interval = budget.poll_interval(suggested) if budgeted else suggested
+        clock[0] = min(end, clock[0] + interval)
+        while sends_per_hour and next_send <= clock[0] and next_send < end:
+            next_send += 3600 / sends_per_hour
+            if budgeted:
+                affordable = budget.can_afford("liveChatMessages.insert")
+            else:
+                affordable = budget.remaining() >= COSTS["liveChatMessages.insert"]
+            if affordable:
+                budget.charge("liveChatMessages.insert")
+                sent += 1
+            else:
+                refused += 1
+        if not budget.can_afford("liveChatMessages.list"):
+            break
+        budget.charge("liveChatMessages.list")
+        intervals.append(interval)
+        lost += max(0.0, rate * interval - max_results)
+    intervals.sort()
+    return {
+        "hours": (clock[0] - start) / 3600,
+        "interval": intervals[len(intervals) // 2] if intervals else 0.0,
+        "sent": sent,
+        "refused": refused,
+        "lost": lost / max(1.0, rate * (clock[0] - start)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a stream and a whole quota day of ytclichat.")
+    parser.add_argument("--rates", default="1,10,50,100,1000", help="chat messages per second")
+    parser.add_argument("--sends-per-hour", type=float, default=2)
+    parser.add_argument("--interval", type=float, default=5, help="pollingIntervalMillis the API suggests, in s")
+    parser.add_argument("--quota", type=int, default=DAILY_QUOTA)
+    parser.add_argument("--stream-hours", type=float, default=STREAM_HOURS)
+    args = parser.parse_args()
+
+    print(f"{args.quota} units/day, {args.sends_per_hour:g} sends/h wanted ({SEND_ALLOWANCE}/day allowed "
+          f"when budgeted), API suggests polling every {args.interval:g}s\n")
+    stream = f"paced to a {args.stream_hours:g}h stream"
+    print(f"{'':>7} {'':>17} | {stream:^36} | {'paced to the quota reset':^36}")
+    print(f"{'msg/s':>7} {'unbudgeted lasts':>17} | "
+          + " | ".join([f"{'lasts':>8} {'poll every':>11} {'sent':>5} {'lost':>8}"] * 2))
+    for rate in (float(r) for r in args.rates.split(",")):
+        plain = simulate(rate, args.sends_per_hour, args.interval, args.quota, budgeted=False)
+        session = simulate(rate, args.sends_per_hour, args.interval, args.quota, session_hours=args.stream_hours)
+        day = simulate(rate, args.sends_per_hour, args.interval, args.quota)
+        print(f"{rate:>7g} {plain['hours']:>16.1f}h | " + " | ".join(
+            f"{paced['hours']:>7.1f}h {paced['interval']:>10.1f}s {paced['sent']:>5} {paced['lost']:>8.1%}"
+            for paced in (session, day)))
+    print(f"\nlost = chat beyond the {MAX_RESULTS}-message page between two budgeted polls")
@@ -0,0 +1,155 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from file_watch import FileWatcher, file_signature
+from metrics import REGISTRY
+
+# ===============================
+# CONFIG
+# ===============================
+FLUSH_INTERVAL = 2  # seconds between background writes of changed settings
+
+FLUSH_TIME = REGISTRY.histogram("settings_io_seconds", "Time spent reading or writing user settings", op="flush")
+MERGE_TIME = REGISTRY.histogram("settings_io_seconds", "Time spent reading or writing user settings", op="merge")
+
+
+# ===============================
+# Write-behind Settings Store
+# ===============================
+class SettingsStore(dict):
+    """``user_settings`` dict that writes itself to disk in the background.
+
+    Assigning a user marks it dirty instead of rewriting the JSON file on the
+    chat thread. A daemon thread flushes all pending changes in one atomic
+    write (temp file + rename) every ``flush_interval`` seconds, so adding a
+    chatter costs the same no matter how many users are stored.
+
+    ``watch()`` picks up edits made to the file by hand while running: the
+    file is parsed on the watcher thread and only users whose settings
+    differ are swapped in. The store's own writes are recognised by their
+    file signature and skipped.
+    """
+
+    def __init__(self, path: str, flush_interval: float = FLUSH_INTERVAL, indent: int = None):
+        super().__init__()
+        self.path = path
+        self.flush_interval = flush_interval
+        self.indent = indent
+        self.dirty = set()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # keeps snapshots landing in order
+        self._stop = threading.Event()
+        self._thread = None
+        self._watcher = None
+        self._seen = None  # signature of the file as last written or read by us
+
+    def __setitem__(self, username, settings):
+        with self._lock:
+            super().__setitem__(username, settings)
+            self.dirty.add(username)
+
+    def mark_dirty(self, username):
+        """Call after changing a user's settings dict in place."""
+        with self._lock:
+            self.dirty.add(username)
+
+    def load(self):
+        """Replace the in-memory settings with the file's contents.
+
+        Users with changes not yet flushed keep their in-memory settings.
+        """
+        data = {}
+        with self._write_lock:  # not while a flush is between snapshot and rename
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self._seen = file_signature(self.path)
+            with self._lock:
+                pending = {u: dict.get(self, u) for u in self.dirty if u in self}
+                self.clear()
+                self.update(data)
+                self.update(pending)
+        return self
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                if not self.dirty:
+                    return
+                snapshot = dict(self)  # cheap copy; serialize outside the lock
+                pending, self.dirty = self.dirty, set()
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            started = time.perf_counter()
+            fd, tmp_path = tempfile.mkstemp(prefix=".user_settings.", dir=directory)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(snapshot, f, indent=self.indent)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    st = os.fstat(f.fileno())
+                # Known before the rename lands, so the watcher never mistakes it for an edit
+                self._seen = (st.st_ino, st.st_mtime_ns, st.st_size)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                with self._lock:
+                    self.dirty |= pending  # retry on the next flush
+                raise
+            FLUSH_TIME.observe(time.perf_counter() - started)
+
+    def merge_file(self):
+        """Apply outside edits to the file; returns ``(changed, removed)`` usernames.
+
+        Users with changes not yet flushed keep their in-memory settings.
+        """
+        with self._write_lock:  # not while a flush is between snapshot and rename
+            signature = file_signature(self.path)
+            if signature is None or signature == self._seen:
+                return [], []
+            started = time.perf_counter()
+            with open(self.path, "r") as f:
+                data = json.load(f)  # parsed here, never on the chat thread
+            self._seen = signature
+            with self._lock:
+                changed = [u for u, s in data.items() if u not in self.dirty and dict.get(self, u) != s]
+                removed = [u for u in self if u not in data and u not in self.dirty]
+                for username in changed:
+                    super().__setitem__(username, data[username])  # readers see the old or the new dict
+                for username in removed:
+                    super().__delitem__(username)
+            MERGE_TIME.observe(time.perf_counter() - started)
+            return changed, removed
+
+    def watch(self, on_merge=None):
+        """Merge outside edits as soon as the file changes (inotify, or polling)."""
+        def merge():
+            changed, removed = self.merge_file()
+            if (changed or removed) and on_merge:
+                on_merge(changed, removed)
+
+        if self._watcher is None:
+            self._watcher = FileWatcher(self.path, merge).start()
+        return self
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Failed to save settings: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.stop()
+        self.flush()
@@ -0,0 +1,179 @@
+"""ChatCore reading through the real ``pytchat.LiveChatAsync``.
+
+Only YouTube is fake: every httpx client ChatCore creates talks to an
+``httpx.MockTransport`` that answers the channel-ID lookup and serves a few
+batches of chat per connection before ending the stream, the way YouTube
+does when a chat drops.
+
+    python -m pytest test_chat_core.py
+"""
+import asyncio
+import base64
+import json
+import time
+import types
+from urllib.parse import unquote
+
+import httpx
+import pytest
+from pytchat.paramgen import liveparam
+
+import chat_core
+
+FETCH_INTERVAL_MS = 20
+REAL_CLIENT = httpx.AsyncClient
+
+
+def channel_of(video_id: str) -> str:
+    return "UC" + video_id + "x" * 11
+
+
+def chat_json(message_id: str) -> dict:
+    """One live chat response holding a single text message."""
+    item = {"liveChatTextMessageRenderer": {
+        "id": message_id,
+        "timestampUsec": str(int(time.time() * 1e6)),
+        "message": {"runs": [{"text": f"hello from {message_id}"}]},
+        "authorName": {"simpleText": "viewer"},
+        "authorExternalChannelId": channel_of(message_id.split("/")[0]),
+        "authorPhoto": {"thumbnails": [{"url": ""}, {"url": ""}]},
+    }}
+    return {"continuationContents": {"liveChatContinuation": {
+        "continuations": [{"timedContinuationData": {"continuation": "next", "timeoutMs": FETCH_INTERVAL_MS}}],
+        "actions": [{"addChatItemAction": {"item": item}}],
+    }}}
+
+
+class FakeYouTube:
+    """Stands in for ``httpx.AsyncClient``; each client is one pytchat connection."""
+
+    def __init__(self, batches: int = 1):
+        self.batches = batches  # chat responses per connection before the stream ends
+        self.clients = []
+        self.connections = []  # video ID of each connection, in order
+
+    def _video_of(self, request: httpx.Request) -> str:
+        """The video a connection's first chat request is for, read from its continuation."""
+        continuation = base64.urlsafe_b64decode(unquote(json.loads(request.content)["continuation"]))
+        return next(v for v in set(self.connections) if liveparam._header(v, channel_of(v)) in continuation)
+
+    def __call__(self, **kwargs):
+        state = {"video_id": None, "fetches": 0, "n": 0}
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            if request.method == "GET":  # channel ID lookup before each connection
+                video_id = request.url.path.rsplit("/", 1)[-1]
+                self.connections.append(video_id)
+                return httpx.Response(200, text=f'\\"channelId\\":\\"{channel_of(video_id)}\\"')
+            if state["video_id"] is None:
+                state["video_id"] = self._video_of(request)
+                state["n"] = self.connections.count(state["video_id"])
+            state["fetches"] += 1
+            if state["fetches"] > self.batches:
+                return httpx.Response(200, json={})  # no continuationContents: the chat dropped
+            return httpx.Response(200, json=chat_json(f"{state['video_id']}/{state['n']}/{state['fetches']}"))
+
+        client = REAL_CLIENT(transport=httpx.MockTransport(handle))
+        self.clients.append(client)
+        return client
+
+
+@pytest.fixture
+def youtube(monkeypatch):
+    fake = FakeYouTube()
+    monkeypatch.setattr(chat_core.httpx, "AsyncClient", fake)
+    monkeypatch.setattr(chat_core, "RECONNECT_DELAY", 0)
+    monkeypatch.setattr(chat_core.random, "uniform", lambda a, b: 0)
+    return fake
+
+
+async def run_until(core: chat_core.ChatCore, done, timeout: float = 10):
+    """Run ``core`` until ``done()`` holds; fails after ``timeout`` seconds."""
+    task = asyncio.create_task(core.run())
+
+    async def wait():
+        while not done():
+            await asyncio.sleep(0.01)
+
+    try:
+        await asyncio.wait_for(wait(), timeout)
+    finally:
+        core.stop()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def test_reconnects_after_dropped_connections(youtube):
+    core = chat_core.ChatCore("liveVideo01")
+    seen = []
+    core.add_sink(seen.append)
+
+    asyncio.run(run_until(core, lambda: len(seen) >= 3))
+
+    assert youtube.connections[:3] == ["liveVideo01"] * 3  # dropped twice, reconnected twice
+    assert [c.id for c in seen[:3]] == ["liveVideo01/1/1", "liveVideo01/2/1", "liveVideo01/3/1"]
+    assert len(set(map(id, youtube.clients))) == len(youtube.clients)
+    assert all(client.is_closed for client in youtube.clients)
+
+
+def test_reads_two_sources_at_once(youtube):
+    youtube.batches = 3
+    core = chat_core.ChatCore(merge_hold=0.1)
+    core.attach("channelA_01", "@a")
+    core.attach("channelB_02", "@b")
+    seen = []
+    core.add_sink(seen.append)
+
+    asyncio.run(run_until(core, lambda: {c.source for c in seen} == {"@a", "@b"} and len(seen) >= 6))
+
+    sources = {"channelA_01": "@a", "channelB_02": "@b"}
+    assert all(c.source == sources[c.id.split("/")[0]] and c.merged for c in seen)
+    assert sorted(c.id for c in seen[:6]) == [f"{video}/1/{n}" for video in sorted(sources) for n in (1, 2, 3)]
+    assert all(client.is_closed for client in youtube.clients)
+
+
+def test_switches_to_a_new_video(youtube):
+    youtube.batches = 1000  # neither stream drops on its own
+    core = chat_core.ChatCore("oldVideo001")
+    seen = []
+    core.add_sink(seen.append)
+
+    def switched() -> bool:
+        if seen and core.sources[""].video_id == "oldVideo001":
+            core.attach("newVideo002")
+        return any(c.id.startswith("newVideo002/") for c in seen)
+
+    asyncio.run(run_until(core, switched))
+
+    assert youtube.connections == ["oldVideo001", "newVideo002"]
+    first_new = next(i for i, c in enumerate(seen) if c.id.startswith("newVideo002/"))
+    assert seen[first_new].id == "newVideo002/1/1"
+    assert all(c.id.startswith("oldVideo001/") for c in seen[:first_new])
+    assert all(client.is_closed for client in youtube.clients)
+
+
+def message(timestamp: int):
+    return types.SimpleNamespace(timestamp=timestamp)
+
+
+def test_merge_waits_for_a_channel_that_has_not_delivered_yet():
+    merger = chat_core.ChatMerger(hold=60)
+    merger.add_source("@a")
+    merger.add_source("@b")
+    merger.push("@a", [message(100), message(300)])
+    assert merger.pop_ready() == []
+
+    merger.push("@b", [message(200)])
+    assert [c.timestamp for c in merger.pop_ready()] == [100, 200]
+
+
+def test_merge_stops_waiting_for_a_channel_that_went_away():
+    merger = chat_core.ChatMerger(hold=60)
+    merger.add_source("@a")
+    merger.add_source("@b")
+    merger.push("@a", [message(100)])
+    merger.push("@b", [message(50)])
+    merger.push("@a", [message(300)])
+    assert [c.timestamp for c in merger.pop_ready()] == [50]
+
+    merger.remove_source("@b")  # its stream ended
+    assert [c.timestamp for c in merger.pop_ready()] == [100, 300]
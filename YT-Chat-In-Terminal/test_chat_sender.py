@@ -0,0 +1,46 @@
+"""EchoFilter: our own messages are shown once, however their echo and confirmation race.
+
+    python -m pytest test_chat_sender.py
+"""
+from chat_sender import EchoFilter
+
+
+def test_echo_before_confirmation_is_hidden():
+    echoes = EchoFilter()
+    echoes.typed("hi")
+
+    assert echoes.is_echo("m1", "hi")
+    echoes.confirmed("hi", "m1")
+    assert echoes.is_echo("m1", "hi")  # seen again on a later page
+    assert not echoes.is_echo("m2", "hi")  # someone else saying it afterwards
+
+
+def test_echo_after_confirmation_is_hidden_by_id():
+    echoes = EchoFilter()
+    echoes.typed("hi")
+    echoes.typed("hi")  # sent twice
+    echoes.confirmed("hi", "m1")
+
+    assert echoes.is_echo("m1", "hi")
+    assert echoes.is_echo("m2", "hi")  # the second one, not confirmed yet
+    assert not echoes.is_echo("m3", "hi")
+
+
+def test_same_text_from_another_channel_is_shown():
+    echoes = EchoFilter()
+    echoes.channel_id = "UCme"
+    echoes.typed("gg")
+
+    assert not echoes.is_echo("m1", "gg", "UCsomeone")
+    assert echoes.is_echo("m2", "gg", "UCme")
+
+
+def test_failed_and_expired_sends_leave_nothing_behind():
+    echoes = EchoFilter(max_age=-1)
+    echoes.typed("lost")
+    assert not echoes.is_echo("m1", "lost")
+
+    echoes = EchoFilter()
+    echoes.typed("refused")
+    echoes.failed("refused")
+    assert not echoes.is_echo("m1", "refused")
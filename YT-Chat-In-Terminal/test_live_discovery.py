@@ -0,0 +1,74 @@
+"""LiveDiscovery and LiveWatcher against a fake ``/live`` page.
+
+    python -m pytest test_live_discovery.py
+"""
+import time
+
+import live_discovery
+from live_discovery import LiveDiscovery, LiveWatcher
+
+LIVE_PAGE = b'{"isLiveNow":true,"videoId":"liveVideo01"}'
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, page: bytes):
+        self.page = page
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        yield self.page
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Serves ``page`` for every handle and counts the requests."""
+
+    def __init__(self, page: bytes = LIVE_PAGE):
+        self.page = page
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        return FakeResponse(self.page)
+
+
+def test_watcher_checks_reuse_the_cached_answer_until_it_expires():
+    session = FakeSession()
+    attached = []
+    watcher = LiveWatcher("@a", on_live=attached.append, finder=LiveDiscovery(ttl=0.2, session=session))
+
+    assert watcher.check() == "liveVideo01"
+    assert watcher.check() == "liveVideo01"
+    assert session.requests == 1
+
+    time.sleep(0.25)
+    watcher.check()
+    assert session.requests == 2
+    assert attached == ["liveVideo01"]
+
+
+def test_watcher_waits_for_the_cached_answer_to_expire(monkeypatch):
+    monkeypatch.setattr(live_discovery, "WATCH_MIN_WAIT", 1)
+    for page, ttl in ((LIVE_PAGE, "ttl"), (b"offline", "not_live_ttl")):
+        finder = LiveDiscovery(ttl=60, not_live_ttl=10, session=FakeSession(page))
+        watcher = LiveWatcher("@a", on_live=lambda video_id: None, finder=finder)
+        waits = []
+
+        def wait(delay):
+            waits.append(delay)
+            if len(waits) == 3:
+                watcher.stop()
+
+        monkeypatch.setattr(watcher._stop, "wait", wait)
+        watcher.run()
+
+        assert all(getattr(finder, ttl) <= delay <= getattr(finder, ttl) * (1 + live_discovery.WATCH_JITTER)
+                   for delay in waits)
+        assert finder.fetches == 1
@@ -0,0 +1,39 @@
+"""/messages?since=<seq> through the Flask test client.
+
+    python -m pytest test_overlay_events.py
+"""
+from flask import Flask, request
+
+from overlay_events import ChatFeed, delta_response
+
+
+def make_app(feed: ChatFeed):
+    app = Flask(__name__)
+    app.add_url_rule("/messages", "messages", lambda: delta_response(feed, request))
+    return app.test_client()
+
+
+def test_returns_only_newer_lines_and_304_when_nothing_changed():
+    feed = ChatFeed()
+    client = make_app(feed)
+    for n in range(3):
+        feed.append({"text": f"line {n}"})
+
+    first = client.get("/messages?since=1")
+    assert first.json == {"next": 3, "messages": [{"text": "line 1", "seq": 2}, {"text": "line 2", "seq": 3}]}
+    again = client.get("/messages?since=1", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_cursor_from_before_a_restart_starts_over():
+    feed = ChatFeed()
+    client = make_app(feed)
+    feed.append({"text": "after restart"})
+
+    stale = client.get("/messages?since=5000")
+    assert stale.json == {"next": 1, "messages": [{"text": "after restart", "seq": 1}]}
+
+    feed.append({"text": "more"})
+    resumed = client.get(f"/messages?since={stale.json['next']}",
+                         headers={"If-None-Match": stale.headers["ETag"]})
+    assert resumed.json["messages"] == [{"text": "more", "seq": 2}]
@@ -0,0 +1,35 @@
+"""QuotaBudget pacing on a fake clock.
+
+    python -m pytest test_quota_budget.py
+"""
+import datetime
+
+import pytest
+
+from quota_budget import QuotaBudget, _TZ
+
+MIDNIGHT = datetime.datetime(2026, 1, 5, tzinfo=_TZ).timestamp()  # start of a quota day
+
+
+def budget_at(clock, **kwargs):
+    # 10,000 units less 1,000 held back for 20 sends leaves 1,800 polls at 5 units
+    return QuotaBudget(10000, path=None, sends=20, clock=lambda: clock[0], **kwargs)
+
+
+def test_polls_at_the_suggested_pace_when_the_quota_lasts_the_stream():
+    clock = [MIDNIGHT]
+    assert budget_at(clock, session_hours=1).poll_interval(5) == 5  # 1,800 polls cover 2.5 h at 5 s
+
+
+def test_stretches_polling_to_last_the_stream_not_the_day():
+    clock = [MIDNIGHT]
+    budget = budget_at(clock, session_hours=4)
+    assert budget.poll_interval(5) == pytest.approx(4 * 3600 / 1800)
+
+    clock[0] += 5 * 3600  # the stream ran long: pace what is left to the reset
+    assert budget.poll_interval(5) == pytest.approx(19 * 3600 / 1800)
+
+
+def test_paces_to_the_reset_without_a_session_length():
+    clock = [MIDNIGHT]
+    assert budget_at(clock, session_hours=None).poll_interval(5) == pytest.approx(24 * 3600 / 1800)
@@ -0,0 +1,22 @@
+"""SettingsStore reloads and merges against a real JSON file.
+
+    python -m pytest test_settings_store.py
+"""
+import json
+
+from settings_store import SettingsStore
+
+
+def test_reload_keeps_users_not_flushed_yet(tmp_path):
+    path = tmp_path / "user_settings.json"
+    store = SettingsStore(str(path)).load()
+    store["alice"] = {"voice": 1}
+    store.flush()
+    store["bob"] = {"voice": 2}  # not written yet
+    path.write_text(json.dumps({"alice": {"voice": 3}}))  # edited by hand
+
+    store.load()
+
+    assert store == {"alice": {"voice": 3}, "bob": {"voice": 2}}
+    store.flush()
+    assert json.loads(path.read_text()) == {"alice": {"voice": 3}, "bob": {"voice": 2}}
@@ -0,0 +1,105 @@
+"""TTSPipeline playback against a real TTSScheduler, with rendering and audio stubbed.
+
+    python -m pytest test_tts_pipeline.py
+"""
+import random
+import time
+
+import tts_pipeline
+from tts_pipeline import PhraseCache, TTSPipeline
+from tts_scheduler import TTSScheduler
+
+
+def wait_for(condition, timeout: float = 3):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_clip_gone_stale_behind_another_is_skipped(tmp_path, monkeypatch):
+    played, done, dropped = [], [], []
+    monkeypatch.setattr(tts_pipeline, "play_wav", lambda *paths: (played.extend(paths), time.sleep(0.3)))
+    scheduler = TTSScheduler(max_age=0.2, on_drop=dropped.append, report_every=0)
+    pipeline = TTSPipeline(scheduler, speech=lambda text: (text, None), on_done=done.append,
+                           cache=PhraseCache(str(tmp_path)))
+    monkeypatch.setattr(pipeline.engines, "submit", lambda voice_id, rate, text, path, clip: clip.set_result(text))
+
+    scheduler.put("first", author="a")
+    scheduler.put("second", author="b")  # fresh when rendered, stale once "first" has played
+    pipeline.start()
+    wait_for(lambda: done and dropped)
+
+    assert played == ["first"]
+    assert done == ["first"] and dropped == ["second"]
+    assert scheduler.spoken == 1 and scheduler.dropped_stale == 1
+    assert scheduler.max_latency < 0.2
+
+
+class RecordingWorker:
+    """Stands in for a render process; notes every voice change it would make."""
+
+    switches = 0
+
+    def __init__(self, volume=None):
+        self.voice = None
+        self.proc = self
+
+    def poll(self):
+        return None
+
+    def render(self, voice_id, rate, text, path):
+        if voice_id != self.voice:
+            RecordingWorker.switches += 1
+            self.voice = voice_id
+        with open(path, "wb") as f:
+            f.write(b"RIFF")
+        time.sleep(0.002)  # rendering takes a while, so jobs queue up
+
+    def close(self):
+        pass
+
+
+def test_new_voices_take_over_least_recently_used_engines(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_pipeline, "RenderWorker", RecordingWorker)
+    monkeypatch.setattr(RecordingWorker, "switches", 0)
+    pool = tts_pipeline.EnginePool(PhraseCache(str(tmp_path)), max_engines=4)
+
+    clips = []
+    pick = random.Random(1).choice
+    for voices in (["v1", "v2", "v3", "v4"], ["v5", "v6", "v7", "v8"]):  # the first chatters leave
+        for n in range(50):
+            clip = tts_pipeline.Future()
+            pool.submit(pick(voices), 150, "hi", str(tmp_path / f"{voices[0]}-{n}.wav"), clip)
+            clips.append(clip)
+    for clip in clips:
+        clip.result(timeout=5)
+
+    assert len(pool) == 4
+    assert RecordingWorker.switches == 8  # each engine set up once, then handed over once
+
+
+def test_repeated_phrases_hit_the_cache_across_authors_and_queue_depths(tmp_path, monkeypatch):
+    played, rendered = [], []
+    monkeypatch.setattr(tts_pipeline, "play_wav", lambda *paths: played.append(paths))
+    scheduler = TTSScheduler(report_every=0)
+    cache = PhraseCache(str(tmp_path))
+    pipeline = TTSPipeline(scheduler, speech=lambda item: item, cache=cache)
+
+    def render(voice_id, rate, text, path, clip):
+        rendered.append((rate, text))
+        with open(path, "wb") as f:
+            f.write(b"RIFF")
+        clip.set_result(path)
+
+    monkeypatch.setattr(pipeline.engines, "submit", render)
+    chat = [("alice", "lol"), ("bob", "lol"), ("alice", "W"), ("carol", "lol"), ("bob", "W")] * 8
+    for author, message in chat:  # queued all at once, so the rate climbs as the backlog drains
+        scheduler.put(((f"{author} says", message), None), author=author)
+    pipeline.start()
+    wait_for(lambda: len(played) == len(chat))
+
+    assert all(len(paths) == 2 for paths in played)
+    assert {rate for rate, _ in rendered} <= set(tts_pipeline.RATE_STEPS)
+    assert len(rendered) <= 5 * len(tts_pipeline.RATE_STEPS)  # 5 distinct phrases, one render per step
+    assert cache.hits > cache.misses
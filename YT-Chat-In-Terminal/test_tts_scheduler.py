@@ -0,0 +1,21 @@
+"""TTSScheduler ordering and the enqueue times it hands back.
+
+    python -m pytest test_tts_scheduler.py
+"""
+import time
+
+from tts_scheduler import TTSScheduler, HIGH, LOW
+
+
+def test_get_returns_when_each_item_was_queued():
+    scheduler = TTSScheduler(report_every=0)
+    before = time.monotonic()
+    scheduler.put("first", LOW, author="a")
+    time.sleep(0.01)
+    scheduler.put("second", HIGH, author="b")
+
+    item, _, second_at = scheduler.get()
+    assert item == "second"
+    item, _, first_at = scheduler.get()
+    assert item == "first"
+    assert before <= first_at < second_at <= time.monotonic()
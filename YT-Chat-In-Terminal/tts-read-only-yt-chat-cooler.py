@@ -1,20 +1,24 @@
-import pyttsx3
-import pytchat
-import threading
-import queue
-import time
-import requests
-import re
-import sys
-import json
-import os
 import random
+from chat_core import ChatCore, source_tag
+from chat_coalesce import Coalescer
+from chat_filter import ModerationFilter, speakable
+from live_discovery import watch_channels
+from tts_scheduler import TTSScheduler, speech_priority, LOW
+from tts_pipeline import TTSPipeline, voice_ids
+from settings_store import SettingsStore
+from metrics import REGISTRY
+from chat_screen import ChatScreen
 
 # ===============================
 # CONFIG
 # ===============================
-CHANNEL_HANDLE = "@BleakRedMN"  # YouTube channel handle
-REFRESH_INTERVAL = 5  # seconds between checking new messages
+CHANNEL_HANDLES = ["@BleakRedMN"]  # YouTube channel handles, merged into one chat
+DEDUP_WINDOW = 20000  # recent message IDs remembered to skip duplicates
+SPAM_WINDOW = 5  # seconds repeated messages are folded into one "W ×37" line
+AUTHOR_LIMIT = 5  # messages per author every 10 s before the extra ones are dropped
+MODERATION_RULES = "moderation.json"  # blocked/allowed words, reloaded on save
+MAX_TTS_LAG = 20  # seconds TTS may fall behind chat before messages are skipped
+METRICS_INTERVAL = 60  # seconds between latency summary lines in the terminal
 YOUR_NAME = "Me"  # Replace with your YouTube display name
 SETTINGS_FILE = "user_settings.json"
 
@@ -34,151 +38,93 @@ COLORS = [RED, GREEN, BLUE, CYAN, YELLOW, MAGENTA]
 # ===============================
 # TTS Setup
 # ===============================
-tts_engine = pyttsx3.init()
-voices = tts_engine.getProperty("voices")
+tts_queue = TTSScheduler(max_age=MAX_TTS_LAG)
 
-tts_engine.setProperty("rate", 150)
-tts_engine.setProperty("volume", 0.8)
+# Clips are rendered by worker processes ahead of playback
+tts_pipeline = TTSPipeline(tts_queue, speech=lambda item: item).start()
 
-tts_queue = queue.Queue()
 
-
-def tts_worker():
-    while True:
-        text, voice_id = tts_queue.get()
-        if text is None:
-            break
-        try:
-            tts_engine.setProperty("voice", voice_id)
-            tts_engine.say(text)
-            tts_engine.runAndWait()
-        except Exception as e:
-            print(f"TTS error: {e}")
-        tts_queue.task_done()
-
-
-threading.Thread(target=tts_worker, daemon=True).start()
-
-
-def speak_async(text, voice_id):
-    tts_queue.put((text, voice_id))
+def speak_async(phrases, voice_id, priority=LOW, author=None):
+    tts_queue.put((phrases, voice_id), priority, author)
 
 
 # ===============================
 # User Settings (Persistent + Hot Reload)
 # ===============================
-user_settings = {}
+user_settings = SettingsStore(SETTINGS_FILE, indent=2).start()
 
 
 def load_user_settings():
-    global user_settings
-    if os.path.exists(SETTINGS_FILE):
-        try:
-            with open(SETTINGS_FILE, "r") as f:
-                user_settings = json.load(f)
-            print(f"{GREEN}🔄 User settings reloaded.{RESET}")
-        except Exception as e:
-            print(f"{RED}⚠️ Failed to load settings: {e}{RESET}")
-    else:
-        user_settings = {}
+    try:
+        user_settings.load()
+        print(f"{GREEN}🔄 User settings reloaded.{RESET}")
+    except Exception as e:
+        print(f"{RED}⚠️ Failed to load settings: {e}{RESET}")
 
 
-def save_user_settings():
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(user_settings, f, indent=2)
+def settings_edited(changed, removed):
+    print(f"{GREEN}🔄 Settings file edited: {len(changed)} users updated, {len(removed)} removed.{RESET}")
 
 
 def get_user_settings(username):
     if username not in user_settings:
         user_settings[username] = {
             "color": random.choice(COLORS),
-            "voice": random.choice(voices).id if voices else None,
-        }
-        save_user_settings()
+            "voice": random.choice(voice_ids() or [None]),
+        }  # written out by the store's background flush
     return user_settings[username]
 
 
 # ===============================
-# Hot Reload Listener
+# Commands ("q" quits, handled by the screen)
 # ===============================
-def reload_listener():
-    while True:
-        cmd = input().strip().lower()
-        if cmd == "r":
-            load_user_settings()
-        elif cmd == "q":
-            print("🛑 Quit requested.")
-            os._exit(0)
-
-
-threading.Thread(target=reload_listener, daemon=True).start()
+def run_command(cmd):
+    if cmd.lower() == "r":
+        load_user_settings()
+    else:
+        print(f"{YELLOW}Commands: r = reload settings, q = quit{RESET}")
 
 
 # ===============================
-# Scrape live video ID
+# Chat Sinks
 # ===============================
-def get_live_video_id(channel_handle: str) -> str:
-    url = f"https://www.youtube.com/{channel_handle}/live"
-    resp = requests.get(url)
-
-    if '"isLiveNow":true' not in resp.text:
-        return None
-
-    match = re.search(r'"videoId":"([a-zA-Z0-9_-]{11})"', resp.text)
-    if match:
-        return match.group(1)
-    return None
+def show_message(c):
+    color = get_user_settings(c.author.name)["color"]
+    print(f"{source_tag(c)}{color}{c.author.name}{RESET}: {c.message}")
 
 
-video_id = get_live_video_id(CHANNEL_HANDLE)
-if not video_id:
-    print(f"{RED}❌ No live stream currently for {CHANNEL_HANDLE}.{RESET}")
-    sys.exit(1)
-
-print(f"✅ Live video ID: {video_id}")
+def speak_message(c):
+    if c.author.name != YOUR_NAME and speakable(c):
+        voice_id = get_user_settings(c.author.name)["voice"]
+        speak_async((f"{c.author.name} says", c.message), voice_id, speech_priority(c), c.author.channelId)
 
 
 # ===============================
 # Chat Reader
 # ===============================
-def run_chat(video_id):
-    processed_messages = set()
-    print(f"🎧 Listening to live chat for {CHANNEL_HANDLE}...\n")
-    load_user_settings()
-
-    while True:
-        try:
-            chat = pytchat.create(video_id=video_id)
-
-            while chat.is_alive():
-                for c in chat.get().sync_items():
-                    msg_id = c.id
-                    if msg_id in processed_messages:
-                        continue
-                    processed_messages.add(msg_id)
-
-                    author = c.author.name
-                    message = c.message
-
-                    settings = get_user_settings(author)
-                    color = settings["color"]
-                    voice_id = settings["voice"]
-
-                    print(f"{color}{author}{RESET}: {message}")
-
-                    if author != YOUR_NAME:
-                        speak_async(f"{author} says {message}", voice_id)
-
-                time.sleep(REFRESH_INTERVAL)
-
-        except Exception as e:
-            print(f"⚠️ Chat connection error: {e}. Reconnecting in 5s...")
-            time.sleep(5)
-            continue
-
+core = ChatCore(dedup_window=DEDUP_WINDOW, coalescer=Coalescer(SPAM_WINDOW, AUTHOR_LIMIT),
+                moderation=ModerationFilter(MODERATION_RULES))
+core.add_sink(show_message)
+core.add_sink(speak_message)
+REGISTRY.gauge("tts_queue_depth", "Messages waiting to be spoken", tts_queue.qsize)
+REGISTRY.gauge("dedup_ids", "Message IDs remembered for dedup", lambda: len(core.processed))
+REGISTRY.gauge("registered_users", "Chatters in the settings file", lambda: len(user_settings))
+REGISTRY.report_every(METRICS_INTERVAL)
+# Attaches each chat once its channel is live, and follows new broadcast IDs
+watch_channels(CHANNEL_HANDLES, core)
+print(f"🎧 Listening to live chat for {', '.join(CHANNEL_HANDLES)}...\n")
+load_user_settings()
+user_settings.watch(settings_edited)  # edits to the file apply while running, no "r" needed
+
+core.start_in_thread()
 
 try:
-    run_chat(video_id)
+    # Full-screen view redrawn a few times a second, with an input line for commands
+    ChatScreen(on_command=run_command, status=REGISTRY.summary).run()
 except KeyboardInterrupt:
-    print("\n🛑 Stopping chat listener...")
-    save_user_settings()
+    pass
+print("\n🛑 Stopping chat listener...")
+print(tts_queue.summary())
+print(core.coalescer.summary())
+print(core.moderation.summary())
+user_settings.close()
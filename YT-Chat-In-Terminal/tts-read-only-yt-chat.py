@@ -1,18 +1,24 @@
-import pyttsx3
-import pytchat
-import threading
-import queue
-import time
-import requests
-import re
-import sys
+from chat_core import ChatCore, source_tag
+from chat_coalesce import Coalescer
+from chat_filter import ModerationFilter, speakable
+from live_discovery import watch_channels
+from tts_scheduler import TTSScheduler, speech_priority, LOW
+from tts_pipeline import TTSPipeline
+from metrics import REGISTRY
+from chat_screen import ChatScreen
 
 # ===============================
 # CONFIG
 # ===============================
-CHANNEL_HANDLE = "@BleakRedMN"  # YouTube channel handle
-REFRESH_INTERVAL = 5  # seconds between checking new messages
+CHANNEL_HANDLES = ["@BleakRedMN"]  # YouTube channel handles, merged into one chat
+DEDUP_WINDOW = 20000  # recent message IDs remembered to skip duplicates
+SPAM_WINDOW = 5  # seconds repeated messages are folded into one "W ×37" line
+AUTHOR_LIMIT = 5  # messages per author every 10 s before the extra ones are dropped
+MODERATION_RULES = "moderation.json"  # blocked/allowed words, reloaded on save
+MAX_TTS_LAG = 20  # seconds TTS may fall behind chat before messages are skipped
+METRICS_INTERVAL = 60  # seconds between latency summary lines in the terminal
 YOUR_NAME = "Me"  # Replace with your YouTube display name
+TTS_VOICE = "gmw/en-us"  # Your preferred voice
 
 # ===============================
 # ANSI Colors for terminal
@@ -35,106 +41,64 @@ def color_name(name: str) -> str:
 # ===============================
 # TTS Setup
 # ===============================
-tts_engine = pyttsx3.init()
-tts_engine.setProperty("voice", "gmw/en-us")  # Your preferred voice
-tts_engine.setProperty("rate", 150)
-tts_engine.setProperty("volume", 0.8)
+tts_queue = TTSScheduler(max_age=MAX_TTS_LAG)
 
-tts_queue = queue.Queue()
+# Clips are rendered by worker processes ahead of playback
+tts_pipeline = TTSPipeline(tts_queue, speech=lambda item: (item, TTS_VOICE)).start()
 
 
-def tts_worker():
-    while True:
-        text = tts_queue.get()
-        if text is None:
-            break
-        try:
-            tts_engine.say(text)
-            tts_engine.runAndWait()
-        except Exception as e:
-            print(f"TTS error: {e}")
-        tts_queue.task_done()
-
-
-threading.Thread(target=tts_worker, daemon=True).start()
-
-
-def speak_async(text):
-    tts_queue.put(text)
+def speak_async(phrases, priority=LOW, author=None):
+    tts_queue.put(phrases, priority, author)
 
 
 # ===============================
-# Scrape live video ID from channel handle
+# Chat Sinks
 # ===============================
-def get_live_video_id(channel_handle: str) -> str:
-    url = f"https://www.youtube.com/{channel_handle}/live"
-    resp = requests.get(url)
+def show_message(c):
+    author = c.author.name
+    message = c.message
 
-    # Check if live
-    if '"isLiveNow":true' not in resp.text:
-        return None
+    # Color based on type
+    author_type = c.author.type
+    if author_type == "owner":
+        color = BOLD + RED
+    elif author_type == "moderator":
+        color = BOLD + BLUE
+    elif author_type == "verified":
+        color = GREEN
+    else:
+        color = color_name(author)
 
-    # Extract video ID
-    match = re.search(r'"videoId":"([a-zA-Z0-9_-]{11})"', resp.text)
-    if match:
-        return match.group(1)
-    return None
+    print(f"{source_tag(c)}{color}{author}{RESET}: {message}")
 
 
-video_id = get_live_video_id(CHANNEL_HANDLE)
-if not video_id:
-    print(f"{RED}❌ No live stream currently for {CHANNEL_HANDLE}.{RESET}")
-    sys.exit(1)
-
-print(f"✅ Live video ID: {video_id}")
+def speak_message(c):
+    if c.author.name != YOUR_NAME and speakable(c):
+        speak_async((f"{c.author.name} says", c.message), speech_priority(c), c.author.channelId)
 
 
 # ===============================
 # Chat Reader
 # ===============================
-def run_chat(video_id):
-    processed_messages = set()
-    print(f"🎧 Listening to live chat for {CHANNEL_HANDLE}...\n")
-
-    while True:
-        try:
-            chat = pytchat.create(video_id=video_id)
-
-            while chat.is_alive():
-                for c in chat.get().sync_items():
-                    msg_id = c.id
-                    if msg_id in processed_messages:
-                        continue
-                    processed_messages.add(msg_id)
-
-                    author = c.author.name
-                    message = c.message
-
-                    # Color based on type
-                    author_type = c.author.type
-                    if author_type == "owner":
-                        color = BOLD + RED
-                    elif author_type == "moderator":
-                        color = BOLD + BLUE
-                    elif author_type == "verified":
-                        color = GREEN
-                    else:
-                        color = color_name(author)
-
-                    print(f"{color}{author}{RESET}: {message}")
-
-                    if author != YOUR_NAME:
-                        speak_async(f"{author} says {message}")
-
-                time.sleep(REFRESH_INTERVAL)
-
-        except Exception as e:
-            print(f"⚠️ Chat connection error: {e}. Reconnecting in 5s...")
-            time.sleep(5)
-            continue
-
+core = ChatCore(dedup_window=DEDUP_WINDOW, coalescer=Coalescer(SPAM_WINDOW, AUTHOR_LIMIT),
+                moderation=ModerationFilter(MODERATION_RULES))
+core.add_sink(show_message)
+core.add_sink(speak_message)
+REGISTRY.gauge("tts_queue_depth", "Messages waiting to be spoken", tts_queue.qsize)
+REGISTRY.gauge("dedup_ids", "Message IDs remembered for dedup", lambda: len(core.processed))
+REGISTRY.report_every(METRICS_INTERVAL)
+# Attaches each chat once its channel is live, and follows new broadcast IDs
+watch_channels(CHANNEL_HANDLES, core)
+print(f"🎧 Listening to live chat for {', '.join(CHANNEL_HANDLES)}...\n")
+
+core.start_in_thread()
 
 try:
-    run_chat(video_id)
+    # Full-screen view redrawn a few times a second; "q" or Ctrl+C quits
+    ChatScreen(status=REGISTRY.summary).run()
 except KeyboardInterrupt:
-    print("\n🛑 Stopping chat listener...")
+    pass
+print("\n🛑 Stopping chat listener...")
+print(tts_queue.summary())
+print(core.coalescer.summary())
+print(core.moderation.summary())
@@ -0,0 +1,378 @@
+"""Two-stage TTS: render clips ahead of time, then play them back to back.
+
+Worker processes (this file run with ``--worker``) turn text into WAV files
+with pyttsx3's ``save_to_file`` while the player thread is still speaking the
+previous message. There is one worker per voice in use, so an engine never
+has to switch voices and different voices render in parallel. Finished clips
+go into a content-addressed disk cache, so common phrases ("lol", "W",
+greetings) are only ever synthesized once. A message can be spoken as
+several clips (``"alice says"`` + ``"lol"``) so the parts that repeat are
+cached on their own, and rates are snapped to ``RATE_STEPS`` so a phrase
+has a handful of renderings rather than one per queue depth.
+"""
+import hashlib
+import importlib.metadata
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from metrics import REGISTRY
+
+# ===============================
+# CONFIG
+# ===============================
+CACHE_DIR = "tts_cache"
+CACHE_MAX_BYTES = 200 * 1024 * 1024  # least recently played clips are evicted past this
+MAX_ENGINES = 4  # synthesis processes, one per voice currently speaking
+ENGINE_IDLE_TIMEOUT = 60  # seconds before an unused voice's process is shut down
+RENDER_AHEAD = 4  # messages rendered before the player needs them
+RATE_STEPS = (150, 190, 230, 260)  # speech rates clips are rendered at; the scheduler's rate snaps to the nearest
+VOLUME = 0.8
+PLAYERS = ("paplay", "pw-play", "aplay", "afplay")  # first one found on PATH plays clips
+VOICE_CACHE = os.path.join(CACHE_DIR, "voices.json")
+VOICE_CACHE_MAX_AGE = 7 * 24 * 3600  # re-enumerate voices at least weekly
+VOICE_DATA_DIRS = (  # espeak voice folders; their mtimes invalidate the voice cache
+    "/usr/share/espeak-ng-data",
+    "/usr/lib/x86_64-linux-gnu/espeak-ng-data",
+    "/usr/local/share/espeak-ng-data",
+    "/usr/share/espeak-data",
+)
+
+SPEECH_WAIT = REGISTRY.histogram("tts_wait_seconds", "Time from TTS enqueue until the clip starts playing")
+SPEECH_TIME = REGISTRY.histogram("tts_speech_seconds", "Time spent playing each TTS clip")
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def snap_rate(rate: int, steps=RATE_STEPS) -> int:
+    return min(steps, key=lambda step: abs(step - rate))
+
+
+# ===============================
+# On-disk Phrase Cache
+# ===============================
+class PhraseCache:
+    """WAV clips keyed by (voice id, rate, normalized text), LRU-evicted by size.
+
+    The rate is part of the key because it changes the audio; callers pass
+    it through ``snap_rate`` so queue depth doesn't multiply the renderings.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = None  # summed on the first added clip, not at startup
+        self.hits = 0
+        self.misses = 0
+
+    def _files(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".wav") and not entry.name.endswith(".tmp.wav"):
+                yield entry.path
+
+    def path_for(self, voice_id, rate: int, text: str) -> str:
+        key = hashlib.sha256(f"{voice_id}\0{rate}\0{normalize(text)}".encode()).hexdigest()
+        return os.path.join(self.directory, key + ".wav")
+
+    def lookup(self, path: str) -> bool:
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def added(self, path: str):
+        with self._lock:
+            if self.total_bytes is None:
+                self.total_bytes = sum(os.path.getsize(p) for p in self._files())
+            else:
+                self.total_bytes += os.path.getsize(path)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        files = sorted(self._files(), key=os.path.getmtime)
+        target = self.max_bytes * 0.9
+        for path in files:
+            if self.total_bytes <= target:
+                break
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self.total_bytes -= size
+            except OSError:
+                pass
+
+
+# ===============================
+# Installed Voices
+# ===============================
+_voice_ids = None
+_voice_lock = threading.Lock()
+
+
+def _voice_fingerprint() -> str:
+    """Changes when pyttsx3 is upgraded or espeak voices are added or removed."""
+    try:
+        parts = [importlib.metadata.version("pyttsx3")]
+    except importlib.metadata.PackageNotFoundError:
+        parts = ["?"]
+    parts.append(sys.platform)
+    for directory in VOICE_DATA_DIRS:
+        for sub in ("", "voices", "lang"):
+            try:
+                parts.append(f"{sub or directory}:{os.stat(os.path.join(directory, sub)).st_mtime_ns}")
+            except OSError:
+                pass
+    return "|".join(parts)
+
+
+def voice_ids() -> list:
+    """IDs of the installed pyttsx3 voices.
+
+    Enumerating them means starting an engine, which takes a while with
+    hundreds of espeak voices, so the list is kept in ``VOICE_CACHE`` and only
+    rebuilt when ``_voice_fingerprint`` changes or the file is a week old.
+    """
+    global _voice_ids
+    with _voice_lock:
+        if _voice_ids is not None:
+            return _voice_ids
+        fingerprint = _voice_fingerprint()
+        try:
+            with open(VOICE_CACHE, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached["fingerprint"] == fingerprint and time.time() - cached["saved"] < VOICE_CACHE_MAX_AGE:
+                _voice_ids = cached["voices"]
+                return _voice_ids
+        except (OSError, ValueError, KeyError):
+            pass
+
+        import pyttsx3
+
+        engine = pyttsx3.init()
+        _voice_ids = [voice.id for voice in engine.getProperty("voices")]
+        try:
+            os.makedirs(os.path.dirname(VOICE_CACHE), exist_ok=True)
+            with open(VOICE_CACHE + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "saved": time.time(), "voices": _voice_ids}, f)
+            os.replace(VOICE_CACHE + ".tmp", VOICE_CACHE)
+        except OSError as e:
+            print(f"⚠️ Could not cache the voice list: {e}")
+        return _voice_ids
+
+
+# ===============================
+# Render Workers
+# ===============================
+class RenderWorker:
+    """One pyttsx3 engine in a child process, fed JSON jobs over stdin."""
+
+    def __init__(self, volume: float = VOLUME):
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(volume)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+        )
+
+    def render(self, voice_id, rate: int, text: str, path: str):
+        self.proc.stdin.write(json.dumps({"voice": voice_id, "rate": rate, "text": text, "path": path}) + "\n")
+        reply = self.proc.stdout.readline()
+        if not reply:
+            raise RuntimeError("TTS render worker exited")
+        error = json.loads(reply).get("error")
+        if error:
+            raise RuntimeError(error)
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+
+
+def _worker_main(volume: float):
+    import pyttsx3
+
+    engine = pyttsx3.init()
+    engine.setProperty("volume", volume)
+    current_voice = None
+    for line in sys.stdin:
+        job = json.loads(line)
+        try:
+            if job["voice"] and job["voice"] != current_voice:
+                engine.setProperty("voice", job["voice"])
+                current_voice = job["voice"]
+            engine.setProperty("rate", job["rate"])
+            part = f"{job['path'][:-4]}.{os.getpid()}.tmp.wav"
+            engine.save_to_file(job["text"], part)
+            engine.runAndWait()
+            os.replace(part, job["path"])
+            reply = {"ok": True}
+        except Exception as e:
+            reply = {"error": str(e)}
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+def play_wav(*paths: str):
+    """Play clips one after another and block until the last finishes."""
+    if sys.platform == "win32":
+        import winsound
+        for path in paths:
+            winsound.PlaySound(path, winsound.SND_FILENAME)
+        return
+    for player in PLAYERS:
+        exe = shutil.which(player)
+        if exe:
+            for path in paths:
+                subprocess.run([exe, path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return
+    raise RuntimeError(f"no audio player found (tried {', '.join(PLAYERS)})")
+
+
+class EnginePool:
+    """Routes render jobs to a worker process dedicated to their voice.
+
+    Workers start on a voice's first message and exit after
+    ``idle_timeout`` seconds without work. Past ``max_engines`` voices, the
+    least recently used worker is handed over to the new voice, so the
+    voices chatting right now keep engines of their own and a worker
+    switches voice once per handover rather than once per job.
+    """
+
+    def __init__(self, cache: PhraseCache, volume: float = VOLUME,
+                 max_engines: int = MAX_ENGINES, idle_timeout: float = ENGINE_IDLE_TIMEOUT):
+        self.cache = cache
+        self.volume = volume
+        self.max_engines = max_engines
+        self.idle_timeout = idle_timeout
+        self._lanes = OrderedDict()  # voice id -> job queue, least recently used first
+        self._lock = threading.Lock()
+
+    def submit(self, voice_id, rate: int, text: str, path: str, clip: Future):
+        with self._lock:
+            jobs = self._lanes.get(voice_id)
+            if jobs is not None:
+                self._lanes.move_to_end(voice_id)
+            elif len(self._lanes) < self.max_engines:
+                jobs = self._lanes[voice_id] = queue.Queue()
+                threading.Thread(target=self._run, args=(jobs,), daemon=True).start()
+            else:
+                # Jobs already queued for the old voice still render there, then it stays on this one
+                _, jobs = self._lanes.popitem(last=False)
+                self._lanes[voice_id] = jobs
+            jobs.put((voice_id, rate, text, path, clip))
+
+    def _run(self, jobs: queue.Queue):
+        worker = RenderWorker(self.volume)
+        try:
+            while True:
+                try:
+                    voice_id, rate, text, path, clip = jobs.get(timeout=self.idle_timeout)
+                except queue.Empty:
+                    with self._lock:
+                        if jobs.empty():
+                            for voice_id, lane in list(self._lanes.items()):
+                                if lane is jobs:
+                                    del self._lanes[voice_id]
+                            return
+                    continue
+                try:
+                    worker.render(voice_id, rate, text, path)
+                    self.cache.added(path)
+                    clip.set_result(path)
+                except Exception as e:
+                    clip.set_exception(e)
+                    if worker.proc.poll() is not None:
+                        worker = RenderWorker(self.volume)
+        finally:
+            worker.close()
+
+    def __len__(self) -> int:
+        return len(self._lanes)
+
+
+# ===============================
+# Pipeline
+# ===============================
+class TTSPipeline:
+    """Pulls from a ``TTSScheduler``, renders ahead, plays clips in order.
+
+    ``speech(item)`` turns a queued item into ``(text, voice_id)``, where
+    ``text`` may also be a tuple of phrases rendered as separate clips and
+    played back to back; ``on_start(item)`` / ``on_done(item)`` run around playback on the player
+    thread (e.g. to update an overlay).
+    """
+
+    def __init__(self, scheduler, speech, on_start=None, on_done=None,
+                 render_ahead: int = RENDER_AHEAD, cache: PhraseCache = None,
+                 volume: float = VOLUME, max_engines: int = MAX_ENGINES):
+        self.scheduler = scheduler
+        self.speech = speech
+        self.on_start = on_start
+        self.on_done = on_done
+        self.cache = cache or PhraseCache()
+        self.engines = EnginePool(self.cache, volume, max_engines)
+        self._ready = queue.Queue(maxsize=render_ahead)
+
+    def start(self):
+        threading.Thread(target=self._feed_loop, daemon=True).start()
+        threading.Thread(target=self._play_loop, daemon=True).start()
+        return self
+
+    def _feed_loop(self):
+        while True:
+            item, rate, enqueued_at = self.scheduler.get()
+            text, voice_id = self.speech(item)
+            rate = snap_rate(rate)
+            clips = []
+            for phrase in (text,) if isinstance(text, str) else text:
+                clip = Future()
+                path = self.cache.path_for(voice_id, rate, phrase)
+                if self.cache.lookup(path):
+                    clip.set_result(path)
+                else:
+                    self.engines.submit(voice_id, rate, normalize(phrase), path, clip)
+                clips.append(clip)
+            self._ready.put((item, clips, enqueued_at))  # blocks once RENDER_AHEAD messages are waiting
+
+    def _play_loop(self):
+        while True:
+            item, clips, enqueued_at = self._ready.get()
+            on_done = self.on_done
+            try:
+                paths = [clip.result() for clip in clips]
+                if self.scheduler.expire(item, enqueued_at):
+                    on_done = None  # went stale behind the clips before it; on_drop has it
+                    continue
+                if self.on_start:
+                    self.on_start(item)
+                started = time.monotonic()
+                SPEECH_WAIT.observe(self.scheduler.started(enqueued_at))
+                play_wav(*paths)
+                SPEECH_TIME.observe(time.monotonic() - started)
+            except Exception as e:
+                print(f"TTS error: {e}")
+            finally:
+                if on_done:
+                    try:
+                        on_done(item)
+                    except Exception as e:
+                        print(f"TTS error: {e}")
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--worker"]:
+    _worker_main(float(sys.argv[2]) if len(sys.argv) > 2 else VOLUME)
@@ -0,0 +1,209 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+# ===============================
+# CONFIG
+# ===============================
+BASE_RATE = 150  # words per minute with an empty queue
+MAX_RATE = 260  # fastest it will ever talk
+RATE_STEP = 10  # extra words per minute for each message waiting
+MAX_AGE = 20  # seconds; older messages are skipped so TTS stays near live
+MAX_QUEUE = 40  # waiting messages before the oldest low-priority ones are shed
+REPORT_EVERY = 50  # print a latency summary every N spoken messages
+AGE_STEP = 5  # seconds of waiting worth one priority level, so nothing starves
+
+LOW = 0  # regular chat
+MEMBER = 1  # channel members and verified accounts
+HIGH = 2  # moderators and new memberships
+PAID = 3  # superchats, super stickers, donations
+OWNER = 4  # the channel owner
+PAID_TYPES = ("superChat", "superSticker", "donation")
+
+
+def speech_priority(c) -> int:
+    """Priority for a pytchat message, from its author flags and message type."""
+    author = c.author
+    kind = getattr(c, "type", "textMessage")
+    if getattr(author, "isChatOwner", False):
+        return OWNER
+    if kind in PAID_TYPES:
+        return PAID
+    if getattr(author, "isChatModerator", False) or kind == "newSponsor":
+        return HIGH
+    if getattr(author, "isChatSponsor", False) or getattr(author, "isVerified", False):
+        return MEMBER
+    return LOW
+
+
+# ===============================
+# Backlog-aware TTS Queue
+# ===============================
+class TTSScheduler:
+    """Replacement for the plain ``tts_queue`` that keeps TTS close to live.
+
+    - ``get`` returns the next item together with a speech rate that rises
+      with the number of messages still waiting, and when it was queued
+    - higher ``priority`` speaks first, but every ``AGE_STEP`` seconds of
+      waiting counts as one level, so ordinary chat is never starved
+    - authors take turns: after someone is spoken, their next message waits
+      behind everyone already queued at the same level
+    - messages older than ``max_age`` seconds are skipped
+    - past ``max_size`` the oldest lowest-priority message is shed
+    - the time from ``put`` to ``started`` (speech start) is tracked and reported
+
+    Each author's messages wait in their own FIFO; a heap holds one entry per
+    author (their next message), and a second heap orders everything for
+    shedding. Entries removed from one heap are skipped lazily in the other,
+    so ``put`` and ``get`` stay O(log n).
+    """
+
+    def __init__(self, max_size: int = MAX_QUEUE, max_age: float = MAX_AGE,
+                 base_rate: int = BASE_RATE, max_rate: int = MAX_RATE,
+                 rate_step: int = RATE_STEP, on_drop=None, report_every: int = REPORT_EVERY,
+                 age_step: float = AGE_STEP):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.base_rate = base_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.on_drop = on_drop
+        self.report_every = report_every
+        self.age_step = age_step
+        self._authors = {}  # author -> deque of entries [enqueued_at, priority, seq, item, live]
+        self._turns = []  # heap of (due, seq, author), one per author with queued messages
+        self._victims = []  # heap of (priority, enqueued_at, seq, entry) for shedding
+        self._size = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        self.spoken = 0
+        self.dropped_stale = 0
+        self.shed = 0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+
+    def _drop(self, item):
+        if self.on_drop is not None:
+            try:
+                self.on_drop(item)
+            except Exception as e:
+                print(f"TTS drop callback error: {e}")
+
+    def _schedule(self, author, entry, since: float):
+        """Give ``author`` a turn for ``entry``, counting its wait from ``since``."""
+        due = since - entry[1] * self.age_step
+        heapq.heappush(self._turns, (due, entry[2], author))
+
+    def put(self, item, priority: int = LOW, author=None):
+        """Queue ``item``; messages from the same ``author`` are spoken in turn."""
+        victim = None
+        with self._cond:
+            now = time.monotonic()
+            seq = next(self._seq)
+            entry = [now, priority, seq, item, True]
+            if author is None:
+                author = ("#", seq)  # no author: a queue of its own
+            pending = self._authors.get(author)
+            if pending is None:
+                pending = self._authors[author] = deque()
+                self._schedule(author, entry, now)
+            else:
+                while pending and not pending[0][4]:
+                    pending.popleft()  # shed while waiting
+                while pending and not pending[-1][4]:
+                    pending.pop()
+            pending.append(entry)
+            heapq.heappush(self._victims, (priority, now, seq, entry))
+            self._size += 1
+            if self._size > self.max_size:
+                victim = self._shed()
+            self._cond.notify()
+        if victim is not None:
+            self._drop(victim)
+
+    def _shed(self):
+        while self._victims:
+            entry = heapq.heappop(self._victims)[3]
+            if entry[4]:
+                entry[4] = False
+                self._size -= 1
+                self.shed += 1
+                return entry[3]
+        return None
+
+    def _next(self):
+        """Pop the entry whose turn it is; the caller holds the lock."""
+        while True:
+            while not self._turns:
+                self._cond.wait()
+            _, _, author = heapq.heappop(self._turns)
+            pending = self._authors[author]
+            while pending and not pending[0][4]:
+                pending.popleft()  # shed while waiting
+            if not pending:
+                del self._authors[author]
+                continue
+            entry = pending.popleft()
+            entry[4] = False
+            self._size -= 1
+            while pending and not pending[0][4]:
+                pending.popleft()
+            if pending:
+                # Back of the line: the next message's wait starts now
+                self._schedule(author, pending[0], time.monotonic())
+            else:
+                del self._authors[author]
+            if len(self._victims) > 2 * self._size + 64:
+                self._victims = [v for v in self._victims if v[3][4]]
+                heapq.heapify(self._victims)
+            return entry
+
+    def rate(self, depth: int = None) -> int:
+        """Speech rate for the given (or current) queue depth."""
+        if depth is None:
+            depth = self._size
+        return min(self.max_rate, self.base_rate + depth * self.rate_step)
+
+    def get(self):
+        """Block until a fresh message is available; returns ``(item, rate, enqueued_at)``.
+
+        Speech may start well after this (clips are rendered ahead), so the
+        player checks ``expire`` again before playing and reports the real
+        start with ``started``.
+        """
+        while True:
+            with self._cond:
+                enqueued_at, _, _, item, _ = self._next()
+                depth = self._size
+            if not self.expire(item, enqueued_at):
+                return item, self.rate(depth), enqueued_at
+
+    def expire(self, item, enqueued_at: float) -> bool:
+        """Skip ``item`` if it has waited longer than ``max_age``; ``True`` if it did."""
+        if time.monotonic() - enqueued_at <= self.max_age:
+            return False
+        self.dropped_stale += 1
+        self._drop(item)
+        return True
+
+    def started(self, enqueued_at: float) -> float:
+        """Record that an item queued at ``enqueued_at`` started playing; returns its wait."""
+        latency = time.monotonic() - enqueued_at
+        self.spoken += 1
+        self.max_latency = max(self.max_latency, latency)
+        self._total_latency += latency
+        if self.report_every and self.spoken % self.report_every == 0:
+            print(f"🔊 {self.summary()}")
+        return latency
+
+    def summary(self) -> str:
+        avg = self._total_latency / self.spoken if self.spoken else 0.0
+        return (f"TTS latency avg {avg:.1f}s, max {self.max_latency:.1f}s | "
+                f"queued {self._size}, spoken {self.spoken}, "
+                f"skipped stale {self.dropped_stale}, shed {self.shed}")
+
+    def qsize(self) -> int:
+        return self._size
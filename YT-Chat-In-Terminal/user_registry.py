@@ -0,0 +1,123 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from metrics import REGISTRY
+
+# ===============================
+# CONFIG
+# ===============================
+DB_FILE = "user_settings.db"
+CACHE_SIZE = 2000  # chatters kept in memory, least recently seen are dropped
+LEGACY_PREFIX = "name:"  # key for users migrated from user_settings.json
+
+LOAD_TIME = REGISTRY.histogram("settings_io_seconds", "Time spent reading or writing user settings", op="load")
+SAVE_TIME = REGISTRY.histogram("settings_io_seconds", "Time spent reading or writing user settings", op="save")
+
+
+# ===============================
+# User Registry (SQLite + LRU)
+# ===============================
+class UserRegistry:
+    """Per-chatter settings keyed by YouTube channel ID.
+
+    Settings live in a local SQLite database and only the chatters seen
+    recently are held in memory, in an LRU cache in front of it. Nothing is
+    read at startup; a user is loaded the first time they speak.
+
+    Users imported from the old name-keyed ``user_settings.json`` are stored
+    under ``name:<display name>`` and re-keyed to their channel ID the first
+    time they show up in chat.
+    """
+
+    def __init__(self, path: str = DB_FILE, new_settings=dict, cache_size: int = CACHE_SIZE):
+        self.new_settings = new_settings
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            " channel_id TEXT PRIMARY KEY,"
+            " name TEXT,"
+            " settings TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _remember(self, channel_id: str, settings: dict):
+        self._cache[channel_id] = settings
+        self._cache.move_to_end(channel_id)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _load(self, channel_id: str, name: str):
+        row = self._db.execute(
+            "SELECT settings FROM users WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        if row:
+            return json.loads(row[0])
+
+        legacy_key = LEGACY_PREFIX + name
+        row = self._db.execute(
+            "SELECT settings FROM users WHERE channel_id = ?", (legacy_key,)
+        ).fetchone()
+        if row:
+            self._db.execute(
+                "UPDATE users SET channel_id = ? WHERE channel_id = ?", (channel_id, legacy_key)
+            )
+            return json.loads(row[0])
+        return None
+
+    def get(self, channel_id: str, name: str) -> dict:
+        """Settings for a chatter, creating them on their first message."""
+        with self._lock:
+            settings = self._cache.get(channel_id)
+            if settings is None:
+                with LOAD_TIME.time():
+                    settings = self._load(channel_id, name)
+                if settings is None:
+                    settings = self.new_settings()
+                    with SAVE_TIME.time():
+                        self._save(channel_id, name, settings)
+            self._remember(channel_id, settings)
+            return settings
+
+    def _save(self, channel_id: str, name: str, settings: dict):
+        self._db.execute(
+            "INSERT OR REPLACE INTO users (channel_id, name, settings) VALUES (?, ?, ?)",
+            (channel_id, name, json.dumps(settings)),
+        )
+
+    def set(self, channel_id: str, name: str, settings: dict):
+        with self._lock, SAVE_TIME.time():
+            self._save(channel_id, name, settings)
+            self._remember(channel_id, settings)
+
+    def migrate_json(self, json_path: str) -> int:
+        """One-time import of a name-keyed user_settings.json. Returns users imported."""
+        with self._lock:
+            done = self._db.execute("SELECT value FROM meta WHERE key = 'migrated'").fetchone()
+            if done or not os.path.exists(json_path):
+                return 0
+            with open(json_path, "r") as f:
+                data = json.load(f)
+            with self._db:
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO users (channel_id, name, settings) VALUES (?, ?, ?)",
+                    ((LEGACY_PREFIX + name, name, json.dumps(s)) for name, s in data.items()),
+                )
+                self._db.execute("INSERT INTO meta (key, value) VALUES ('migrated', ?)", (json_path,))
+            return len(data)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,58 @@
+import json
+import os
+import time
+
+# ===============================
+# CONFIG
+# ===============================
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest"
+DISCOVERY_CACHE = "youtube_v3_discovery.json"
+DISCOVERY_MAX_AGE = 24 * 3600  # seconds before the cached document is revalidated
+
+
+def discovery_document(path: str = DISCOVERY_CACHE, max_age: float = DISCOVERY_MAX_AGE) -> str:
+    """The YouTube Data API v3 discovery document, from disk when possible.
+
+    A copy younger than ``max_age`` is used without touching the network. An
+    older one is revalidated with its ETag (a 304 just renews it), and if
+    Google can't be reached the stale copy is used anyway.
+    """
+    cached = None
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if time.time() - cached["saved"] < max_age:
+            return cached["document"]
+    except (OSError, ValueError, KeyError):
+        cached = None
+
+    import requests
+
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+    try:
+        resp = requests.get(DISCOVERY_URL, headers=headers, timeout=10)
+        if resp.status_code == 304 and cached:
+            document, etag = cached["document"], cached["etag"]
+        else:
+            resp.raise_for_status()
+            document, etag = resp.text, resp.headers.get("ETag")
+    except requests.RequestException as e:
+        if cached is None:
+            raise
+        print(f"⚠️ Could not refresh the API discovery document ({e}), using the cached copy.")
+        return cached["document"]
+
+    try:
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"saved": time.time(), "etag": etag, "document": document}, f)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"⚠️ Could not cache the API discovery document: {e}")
+    return document
+
+
+def build_youtube(credentials):
+    """``build("youtube", "v3")`` without fetching the discovery document every start."""
+    from googleapiclient.discovery import build_from_document
+
+    return build_from_document(discovery_document(), credentials=credentials)
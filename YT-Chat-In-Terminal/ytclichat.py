@@ -1,34 +1,51 @@
 import os
 import pickle
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-import time
+import threading
+from chat_poller import LiveChatPoller
+from chat_screen import ChatScreen
+from chat_sender import SendQueue, EchoFilter
+from quota_budget import QuotaBudget, MAX_RESULTS
+from youtube_client import build_youtube
 
 video_id = "abcdEFGjkg"  # change this
+DAILY_QUOTA = 10000  # your project's YouTube Data API units per day
+SENDS_PER_DAY = 20  # messages you may send; their quota is kept back from polling
+STREAM_HOURS = 4  # how long you expect to watch; polling only slows down if the quota wouldn't last that long
 
 # Step 1: Auth
 SCOPES = ["https://www.googleapis.com/auth/youtube.force-ssl"]
 
 
-creds = None
-if os.path.exists("token.json"):
-    # load existing token
-    with open("token.json", "rb") as token:
-        creds = pickle.load(token)
+def authorize():
+    creds = None
+    if os.path.exists("token.json"):
+        # load existing token
+        with open("token.json", "rb") as token:
+            creds = pickle.load(token)
 
-# if no creds or expired, refresh/login
-if not creds or not creds.valid:
-    if creds and creds.expired and creds.refresh_token:
-        creds.refresh(Request())
-    else:
-        flow = InstalledAppFlow.from_client_secrets_file("credentials.json", SCOPES)
-        creds = flow.run_local_server(port=0)
-    # save creds for next time
-    with open("token.json", "wb") as token:
-        pickle.dump(creds, token)
+    # if no creds or expired, refresh/login (the Google auth modules load only when needed)
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            from google.auth.transport.requests import Request
+
+            creds.refresh(Request())
+        else:
+            from google_auth_oauthlib.flow import InstalledAppFlow
 
-youtube = build("youtube", "v3", credentials=creds)
+            flow = InstalledAppFlow.from_client_secrets_file("credentials.json", SCOPES)
+            creds = flow.run_local_server(port=0)
+        # save creds for next time
+        with open("token.json", "wb") as token:
+            pickle.dump(creds, token)
+    return creds
+
+
+# Every call is charged to today's quota (kept in quota_usage.json); polling slows down if it wouldn't last the stream
+budget = QuotaBudget(DAILY_QUOTA, sends=SENDS_PER_DAY, session_hours=STREAM_HOURS)
+# Set up by connect() on the poll thread, so the screen is up while the Google API client loads
+creds = live_chat_id = poller = sender = None
+connected = threading.Event()
+failure = None  # why connect() gave up, printed once the screen is closed
 
 
 # ANSI Colors
@@ -49,29 +66,37 @@ def color_name(name: str) -> str:
 
 
 # Step 2: Get Live Chat ID
+def connect() -> bool:
+    global creds, live_chat_id, poller, failure
+    creds = authorize()
+    youtube = build_youtube(creds)  # discovery document cached in youtube_v3_discovery.json
+    video_response = (
+        youtube.videos().list(part="liveStreamingDetails", id=video_id).execute()
+    )
+    budget.charge("videos.list")
 
-video_response = (
-    youtube.videos().list(part="liveStreamingDetails", id=video_id).execute()
-)
+    if not video_response["items"]:
+        failure = "❌ No live video found for this ID. Is it live?"
+        return False
 
-if not video_response["items"]:
-    print("❌ No live video found for this ID. Is it live?")
-    exit()
+    live_chat_id = video_response["items"][0]["liveStreamingDetails"]["activeLiveChatId"]
+    print(f"Live chat ID: {live_chat_id}")
+    # Big pages, so a poll stretched by the budget still gets everything said since the last one
+    poller = LiveChatPoller(youtube, live_chat_id, budget=budget, max_results=MAX_RESULTS)
+    connected.set()
+    return True
 
-live_chat_id = video_response["items"][0]["liveStreamingDetails"]["activeLiveChatId"]
-print(f"Live chat ID: {live_chat_id}")
 
+# Step 3: Read messages on their own thread (only new ones, via nextPageToken)
+echoes = EchoFilter()  # messages we sent, already on screen before the API echoes them
 
-# Step 3: Read messages in loop
-def read_chat():
-    request = youtube.liveChatMessages().list(
-        liveChatId=live_chat_id, part="snippet,authorDetails"
-    )
-    response = request.execute()
 
-    for item in response["items"]:
+def read_chat():
+    for item in poller.poll():
         author = item["authorDetails"]["displayName"]
         message = item["snippet"]["displayMessage"]
+        if echoes.is_echo(item["id"], message, item["authorDetails"].get("channelId")):
+            continue
 
         if item["authorDetails"]["isChatOwner"]:
             color = BOLD + RED
@@ -85,33 +110,84 @@ def read_chat():
         print(f"{color}{author}{RESET}: {message}")
 
 
-# Step 4: Send a message
+def poll_loop():
+    global failure
+    try:
+        if not connect():
+            screen.stop()
+            return
+    except Exception as e:
+        failure = f"❌ Could not connect to YouTube: {e}"
+        screen.stop()
+        return
+    while True:
+        try:
+            read_chat()
+        except Exception as e:
+            print(f"⚠️ Failed to fetch chat: {e}")
+        poller.wait()  # rest of pollingIntervalMillis
 
-MAX_LENGTH = 200  # YouTube live chat limit
 
+# Step 4: Send messages through a rate-limited queue on another thread
+
+MAX_LENGTH = 200  # YouTube live chat limit
 
 def send_message(text):
+    global sender
+    connected.wait()  # typed before the chat was found
+    if sender is None:
+        # googleapiclient clients are not thread-safe, so the sender gets its own
+        sender = build_youtube(creds)
+    try:
+        response = sender.liveChatMessages().insert(
+            part="snippet",
+            body={
+                "snippet": {
+                    "liveChatId": live_chat_id,
+                    "type": "textMessageEvent",
+                    "textMessageDetails": {"messageText": text},
+                }
+            },
+        ).execute()
+    finally:
+        budget.charge("liveChatMessages.insert")
+    echoes.channel_id = response.get("snippet", {}).get("authorChannelId") or echoes.channel_id
+    return response.get("id")
+
+
+def message_sent(text, message_id, error):
+    if error is None:
+        echoes.confirmed(text, message_id)
+        print(f"{GREEN}✓ Delivered: {text}{RESET}")
+    else:
+        echoes.failed(text)
+        print(f"{RED}❌ Not sent: {text} ({error}){RESET}")
+
+
+outbox = SendQueue(send_message, on_result=message_sent).start()
+
+
+def type_message(text):
     if len(text) > MAX_LENGTH:
         print(f"❌ Message too long ({len(text)} chars). Limit is {MAX_LENGTH}.")
-        return
-
-    youtube.liveChatMessages().insert(
-        part="snippet",
-        body={
-            "snippet": {
-                "liveChatId": live_chat_id,
-                "type": "textMessageEvent",
-                "textMessageDetails": {"messageText": text},
-            }
-        },
-    ).execute()
-
-
-# Example loop
-while True:
-    read_chat()
-    cmd = input(f"Type a message (max {MAX_LENGTH} chars, leave blank to refresh): ")
-    if cmd:
-        send_message(cmd)
-        print(f"{BOLD}{CYAN}Me{RESET}: {cmd}")
-    time.sleep(5)
+    elif not budget.can_afford("liveChatMessages.insert"):
+        print(f"{RED}❌ Today's {SENDS_PER_DAY} messages are used up (API quota).{RESET}")
+    else:
+        echoes.typed(text)  # before it can be sent, so even the quickest echo is caught
+        if outbox.submit(text):
+            print(f"{BOLD}{CYAN}Me{RESET}: {text} {YELLOW}(sending...){RESET}")  # shown before YouTube confirms
+        else:
+            echoes.failed(text)
+            print(f"{RED}❌ Too many messages waiting to be sent, try again in a moment.{RESET}")
+
+
+screen = ChatScreen(on_command=type_message, quit_command="/quit")
+threading.Thread(target=poll_loop, daemon=True).start()
+print(f"Type a message (max {MAX_LENGTH} chars) and press Enter, /quit to exit.")
+try:
+    screen.run()
+except KeyboardInterrupt:
+    pass
+if failure:
+    print(failure)
+print(budget.summary())